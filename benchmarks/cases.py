@@ -0,0 +1,185 @@
+"""Przypadki benchmarków: każdy zwraca (mierzona funkcja, ile operacji robi jedno wywołanie, reset albo None)
+
+Przygotowanie (budowa gry, rozstawienie) i reset przed każdym wywołaniem są poza mierzonym
+czasem. Gry są z ustalonych ziaren, więc każde uruchomienie mierzy dokładnie to samo.
+"""
+from collections import deque
+
+from game.board_view import BoardView
+from game.constants import WIDTH, HEIGHT, HEX_SIZE
+from game.enums import ActionType
+from game.game_state import create_game
+from game.hand import NUM_RESOURCES
+from game.policies import GreedyPolicy
+from simulate import play_game, policy_rng
+
+SEED = 1234
+ROLLS = (2, 3, 4, 5, 6, 8, 9, 10, 11, 12)
+
+
+def midgame(seed=SEED, num_players=3, turns=40):
+    """Gra po rozstawieniu i kilkudziesięciu turach chciwych graczy (są wioski, miasta i drogi)"""
+    game = create_game(num_players, rng=seed)
+    game.start_initial_placement()
+    policy = GreedyPolicy()
+    rng = policy_rng(seed)
+    played = 0
+    while played < turns and game.get_winner() is None:
+        action = policy.choose_action(game, game.legal_actions(), rng)
+        game.apply_action(action)
+        if action[0] == ActionType.END_TURN:
+            played += 1
+    return game
+
+
+def give_resources(game, amount):
+    for player in game.players:
+        player['resources'][:] = [amount] * NUM_RESOURCES
+
+
+def bench_distribute_resources():
+    game = midgame()
+    snapshot = game.snapshot()
+
+    def run():
+        for roll in ROLLS:
+            game.distribute_resources(roll)
+    return run, len(ROLLS), lambda: game.restore(snapshot)
+
+
+def bench_build_road():
+    """Budowa dróg po kolei z kandydatów, od stanu po rozstawieniu"""
+    game = midgame(turns=0)
+    while game.initial_placement_phase:
+        game.apply_action(game.legal_actions()[0])
+    give_resources(game, 20)
+    snapshot = game.snapshot()
+    roads = 10
+
+    def run():
+        player_id = game.current_player_idx
+        topology = game.board.topology
+        for _ in range(roads):
+            edge = min(game.road_candidates[player_id])
+            game.build_road(*topology.edge_vertices[edge], player_id)
+    return run, roads, lambda: game.restore(snapshot)
+
+
+def branchy_game():
+    """Jeden gracz z rozgałęzionym drzewem 15 dróg ze środka planszy (darmowe, jak w rozstawianiu)"""
+    game = create_game(2, rng=SEED)
+    topology = game.board.topology
+    start = topology.hex_vertices[topology.num_hexes // 2][0]
+    game.build_settlement(start, 0, initial_placement=True)
+    queue = deque([start])
+    seen = {start}
+    while queue and game.players[0]['roads_left']:
+        vertex = queue.popleft()
+        for other in topology.vertex_neighbors[vertex]:
+            if other not in seen and game.players[0]['roads_left']:
+                seen.add(other)
+                game.build_road(vertex, other, 0)
+                queue.append(other)
+    return game
+
+
+def bench_longest_road_card():
+    game = branchy_game()
+
+    def run():
+        game.update_longest_road_card()
+    return run, 1, None
+
+
+def bench_longest_road_rebuild():
+    """Pełne przeliczenie najdłuższej drogi na rozgałęzionej sieci (DFS z każdego końca)"""
+    game = branchy_game()
+
+    def run():
+        game.longest_roads.rebuild()
+    return run, 1, None
+
+
+def bench_handle_robber():
+    """Siódemka, gdy każdy gracz ma po 4 karty każdego zasobu i musi odrzucić połowę"""
+    game = midgame()
+    give_resources(game, 4)
+    snapshot = game.snapshot()
+
+    def run():
+        game.handle_robber()
+    return run, 1, lambda: game.restore(snapshot)
+
+
+def bench_legal_actions():
+    game = midgame()
+    give_resources(game, 4)
+
+    def run():
+        game.legal_actions()
+    return run, 1, None
+
+
+def bench_snapshot_restore():
+    game = midgame()
+
+    def run():
+        game.restore(game.snapshot())
+    return run, 1, None
+
+
+def bench_headless_game():
+    """Cała gra dwóch chciwych graczy bez grafiki, jak w simulate.py"""
+    games = 3
+
+    def run():
+        for seed in range(SEED, SEED + games):
+            play_game(seed, ['greedy', 'greedy'])
+    return run, games, None
+
+
+def _render_setup():
+    import pygame  # Tylko dla benchmarków grafiki, reszta działa bez pygame
+    pygame.font.init()
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    font = pygame.font.SysFont(None, 24)
+    game = midgame()
+    view = BoardView(game.board.topology, WIDTH // 2, HEIGHT // 2, HEX_SIZE)
+    return surface, font, game, view
+
+
+def bench_render_game():
+    """Pełna klatka graphics.render_game na powierzchni poza ekranem"""
+    from game.graphics import render_game
+    surface, font, game, view = _render_setup()
+
+    def run():
+        render_game(surface, font, game, view)
+    return run, 1, None
+
+
+def bench_render_dirty():
+    """Klatka BoardRenderer, gdy nic się nie zmieniło (tylko porównanie stanu)"""
+    from game.graphics import BoardRenderer
+    surface, font, game, view = _render_setup()
+    renderer = BoardRenderer(surface, font, view)
+    renderer.render(game)
+
+    def run():
+        renderer.render(game)
+    return run, 1, None
+
+
+# Nazwa -> przypadek; grafika jest na końcu, bo wymaga pygame
+BENCHMARKS = {
+    'distribute_resources': bench_distribute_resources,
+    'build_road': bench_build_road,
+    'update_longest_road_card': bench_longest_road_card,
+    'longest_road_rebuild': bench_longest_road_rebuild,
+    'handle_robber': bench_handle_robber,
+    'legal_actions': bench_legal_actions,
+    'snapshot_restore': bench_snapshot_restore,
+    'headless_game': bench_headless_game,
+    'render_game': bench_render_game,
+    'render_dirty': bench_render_dirty,
+}
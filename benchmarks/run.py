@@ -0,0 +1,112 @@
+"""Benchmarki silnika gry z zapisem wyników do JSON i porównaniem z zapisaną bazą
+
+Przykłady:
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.15
+    python -m benchmarks.run build_road handle_robber
+Przy --compare kod wyjścia to 1, jeśli któryś przypadek jest wolniejszy o więcej niż próg.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.cases import BENCHMARKS
+
+MIN_TIME = 0.2  # Ile sekund trwa jedna seria pomiarów
+REPEAT = 5
+THRESHOLD = 0.15  # O ile wolniej (względnie) to już regresja
+
+
+def measure(case, repeat=REPEAT, min_time=MIN_TIME):
+    """Czas jednej operacji w mikrosekundach: mediana i najlepsza z serii"""
+    run, ops, reset = case()
+    per_op = []
+    calls = None
+    for _ in range(repeat):
+        elapsed = 0.0
+        done = 0
+        while elapsed < min_time if calls is None else done < calls:
+            if reset is not None:
+                reset()
+            start = time.perf_counter()
+            run()
+            elapsed += time.perf_counter() - start
+            done += 1
+        calls = done  # Kolejne serie robią tyle samo wywołań co pierwsza
+        per_op.append(elapsed / (done * ops) * 1e6)
+    return {
+        'median_us': statistics.median(per_op),
+        'best_us': min(per_op),
+        'ops_per_s': 1e6 / statistics.median(per_op),
+        'calls': calls * ops
+    }
+
+
+def run_benchmarks(names, repeat=REPEAT, min_time=MIN_TIME):
+    results = {}
+    for name in names:
+        try:
+            results[name] = measure(BENCHMARKS[name], repeat, min_time)
+        except ImportError as error:
+            print(f"{name}: pominięty ({error})", file=sys.stderr)
+            continue
+        print(f"{name:28s} {results[name]['median_us']:12.2f} us/op  (najlepiej {results[name]['best_us']:.2f})")
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Porównanie median z bazą, zwraca nazwy przypadków wolniejszych o więcej niż threshold"""
+    regressions = []
+    print(f"\n{'przypadek':28s} {'baza us':>12s} {'teraz us':>12s} {'zmiana':>8s}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:28s} {'-':>12s} {result['median_us']:12.2f}   (nowy)")
+            continue
+        before = baseline[name]['median_us']
+        change = result['median_us'] / before - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESJA'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  szybciej'
+        print(f"{name:28s} {before:12.2f} {result['median_us']:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarki silnika gry Catan")
+    parser.add_argument('names', nargs='*', help="przypadki do uruchomienia, domyślnie wszystkie")
+    parser.add_argument('--save', help="zapisz wyniki jako bazę (JSON)")
+    parser.add_argument('--compare', help="porównaj z bazą z pliku JSON")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--min-time', type=float, default=MIN_TIME)
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"nieznane przypadki: {', '.join(unknown)} (są: {', '.join(BENCHMARKS)})")
+
+    results = run_benchmarks(args.names or list(BENCHMARKS), args.repeat, args.min_time)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'results': results
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from .dice import DICE_SUMS
+from .hand import DESERT, HEX_CODES, NUM_RESOURCES
+
+# Na ile sposobów z 36 wypada dany numerek, czyli ile razy na 36 rzutów hex coś daje
+TOKEN_PIPS = {token: 6 - abs(7 - token) for token in DICE_SUMS}
+
+
+class BoardAnalysis:
+    """Tabele do oceny wierzchołków, liczone raz na planszę
+
+    vertex_pips[v][r] to pipsy zasobu r (indeks Resource) z hexów przy wierzchołku v,
+    czyli ile razy na 36 rzutów wioska w v dostanie ten zasób. Hex ze złodziejem się nie liczy,
+    więc move_robber poprawia tylko wierzchołki starego i nowego hexa. player_yield to samo
+    dla gracza, z wioskami (x1) i miastami (x2), aktualizowane przez set_building.
+    """
+    __slots__ = ('vertex_hexes', 'hex_vertices', 'hex_resources', 'hex_pips', 'vertex_grants',
+                 'vertex_pips', 'robber_hex', 'vertex_owner', 'vertex_amount', 'player_yield')
+
+    def __init__(self, hexes, topology, robber_hex=None):
+        self.vertex_hexes = topology.vertex_hexes
+        self.hex_vertices = topology.hex_vertices
+        self.hex_resources = [HEX_CODES[hex_data['resource']] for hex_data in hexes]  # Pustynia = DESERT
+        self.hex_pips = [TOKEN_PIPS[hex_data['token']] if hex_data['token'] else 0 for hex_data in hexes]
+        # Zasoby za postawienie wioski w fazie początkowej (każdy hex oprócz pustyni, także ze złodziejem)
+        self.vertex_grants = tuple(
+            tuple(self.hex_resources[hex_id] for hex_id in hex_ids if self.hex_resources[hex_id] != DESERT)
+            for hex_ids in self.vertex_hexes)
+
+        self.vertex_pips = [[0] * NUM_RESOURCES for _ in self.vertex_hexes]
+        for vertex, hex_ids in enumerate(self.vertex_hexes):
+            for hex_id in hex_ids:
+                resource = self.hex_resources[hex_id]
+                if resource != DESERT:
+                    self.vertex_pips[vertex][resource] += self.hex_pips[hex_id]
+
+        self.robber_hex = None
+        self.vertex_owner = [None] * len(self.vertex_hexes)
+        self.vertex_amount = [0] * len(self.vertex_hexes)  # 0 nic, 1 wioska, 2 miasto
+        self.player_yield = {}  # gracz -> pipsy na zasób
+        self.move_robber(robber_hex)
+
+    def vertex_yield(self, vertex):
+        """Ile zasobów na 36 rzutów da wioska w tym miejscu (bez hexa ze złodziejem)"""
+        return sum(self.vertex_pips[vertex])
+
+    def expected_yield(self, player_id):
+        """Ile każdego zasobu gracz dostaje średnio na 36 rzutów, lista indeksowana przez Resource"""
+        return self.player_yield.get(player_id, [0] * NUM_RESOURCES)
+
+    def set_building(self, vertex, player_id, amount):
+        """Wioska 1, miasto 2 - wywołać przy budowie wioski i przy ulepszeniu"""
+        change = amount - self.vertex_amount[vertex]
+        self.vertex_owner[vertex] = player_id
+        self.vertex_amount[vertex] = amount
+        player_yield = self.player_yield.setdefault(player_id, [0] * NUM_RESOURCES)
+        for resource, pips in enumerate(self.vertex_pips[vertex]):
+            player_yield[resource] += change * pips
+
+    def move_robber(self, hex_id):
+        old_hex = self.robber_hex
+        self.robber_hex = hex_id
+        self._change_hex(old_hex, 1)
+        self._change_hex(hex_id, -1)
+
+    def _change_hex(self, hex_id, sign):
+        if hex_id is None or self.hex_resources[hex_id] == DESERT:
+            return
+        resource = self.hex_resources[hex_id]
+        pips = sign * self.hex_pips[hex_id]
+        for vertex in self.hex_vertices[hex_id]:
+            self.vertex_pips[vertex][resource] += pips
+            owner = self.vertex_owner[vertex]
+            if owner is not None:
+                self.player_yield[owner][resource] += self.vertex_amount[vertex] * pips
+
+    def snapshot(self):
+        return (self.robber_hex, tuple(tuple(pips) for pips in self.vertex_pips), tuple(self.vertex_owner),
+                tuple(self.vertex_amount), tuple((player_id, tuple(pips)) for player_id, pips in self.player_yield.items()))
+
+    def restore(self, state):
+        self.robber_hex, vertex_pips, vertex_owner, vertex_amount, player_yield = state
+        self.vertex_pips = [list(pips) for pips in vertex_pips]
+        self.vertex_owner[:] = vertex_owner
+        self.vertex_amount[:] = vertex_amount
+        self.player_yield = {player_id: list(pips) for player_id, pips in player_yield}
@@ -0,0 +1,147 @@
+"""Wiele plansz naraz w tablicach NumPy (pierwszy wymiar to numer gry)
+
+Rzut kostkami, rozdanie zasobów, odrzucanie kart przy 7 i złodziej są jedną operacją
+na wszystkich grach, więc nadaje się to do statystyki układów plansz, a nie do samej gry.
+"""
+import numpy as np
+
+from .board import TOPOLOGY
+from .constants import RESOURCES, TOKENS, RESOURCE_TYPES
+from .enums import BuildingType
+from .hand import DESERT, HEX_CODES, affordable_builds
+
+# Budynek to od razu mnożnik produkcji: nic 0, wioska 1, miasto 2
+BUILDING_AMOUNT = {BuildingType.NONE: 0, BuildingType.SETTLEMENT: 1, BuildingType.CITY: 2}
+
+HEX_VERTICES = np.array(TOPOLOGY.hex_vertices, dtype=np.intp)  # (hexy, 6)
+
+
+class BatchGames:
+    """K gier trzymanych razem: plansze, budynki, złodziej i zasoby graczy"""
+
+    def __init__(self, num_games, num_players, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.num_games = num_games
+        self.num_players = num_players
+        num_hexes = TOPOLOGY.num_hexes
+        self.hex_resources = np.empty((num_games, num_hexes), dtype=np.int8)
+        self.hex_tokens = np.zeros((num_games, num_hexes), dtype=np.int8)
+        self.vertex_owner = np.full((num_games, TOPOLOGY.num_vertices), -1, dtype=np.int8)
+        self.vertex_building = np.zeros((num_games, TOPOLOGY.num_vertices), dtype=np.int8)
+        self.robber_hex = np.full(num_games, -1, dtype=np.intp)
+        self.current_player = np.zeros(num_games, dtype=np.intp)
+        self.resources = np.zeros((num_games, num_players, len(RESOURCE_TYPES)), dtype=np.int32)
+        self.diceroll = np.zeros(num_games, dtype=np.int8)
+        self.shuffle_boards()
+
+    def shuffle_boards(self):
+        """Każda gra dostaje swoje potasowane zasoby i numerki (jak initialize_game)"""
+        resources = np.array([HEX_CODES[resource] for resource in RESOURCES], dtype=np.int8)
+        tokens = np.array(TOKENS, dtype=np.int8)
+        shape = (self.num_games, len(resources))
+        self.hex_resources[:] = resources[self.rng.random(shape).argsort(axis=1)]
+        token_order = self.rng.random((self.num_games, len(tokens))).argsort(axis=1)
+        # W każdym wierszu jest dokładnie jedna pustynia, więc reszta hexów bierze numerki po kolei
+        self.hex_tokens[:] = 0
+        self.hex_tokens[self.hex_resources != DESERT] = tokens[token_order].ravel()
+
+    def load_game(self, index, game):
+        """Kopiuje planszę i zasoby z GameState do gry o numerze index"""
+        for hex_data in game.hexes:
+            self.hex_resources[index, hex_data['id']] = HEX_CODES[hex_data['resource']]
+            self.hex_tokens[index, hex_data['id']] = hex_data['token'] or 0
+        board = game.board
+        self.vertex_owner[index] = [-1 if owner is None else owner for owner in board.vertex_owner]
+        self.vertex_building[index] = [BUILDING_AMOUNT[building] for building in board.vertex_building]
+        self.robber_hex[index] = -1 if game.robber_hex is None else game.robber_hex
+        self.current_player[index] = game.current_player_idx
+        for player in game.players:
+            self.resources[index, player['id']] = player['resources']
+
+    def roll_dice(self):
+        self.diceroll = self.rng.integers(1, 7, size=(self.num_games, 2)).sum(axis=1).astype(np.int8)
+        return self.diceroll
+
+    def distribute_resources(self, rolls):
+        """Wszystkie gry naraz: hexy z wyrzuconym numerkiem (bez złodzieja) płacą budynkom na rogach"""
+        num_hexes = self.hex_tokens.shape[1]
+        producing = ((self.hex_tokens == np.asarray(rolls)[:, None]) &
+                     (np.arange(num_hexes) != self.robber_hex[:, None]))
+        amount = self.vertex_building[:, HEX_VERTICES] * producing[:, :, None]  # (gry, hexy, 6)
+        owner = self.vertex_owner[:, HEX_VERTICES]
+        resource = np.broadcast_to(self.hex_resources[:, :, None], amount.shape)
+        paid = amount > 0
+
+        games = np.broadcast_to(np.arange(self.num_games)[:, None, None], amount.shape)
+        num_resources = self.resources.shape[2]
+        flat = (games[paid] * self.num_players + owner[paid]) * num_resources + resource[paid]
+        self.resources += np.bincount(flat, weights=amount[paid],
+                                      minlength=self.resources.size).astype(np.int32).reshape(self.resources.shape)
+
+    def discard_half(self, games):
+        """Przy 7 każdy z ponad 7 kartami oddaje połowę, losując karty bez zwracania z tego co ma"""
+        hands = self.resources[games]
+        totals = hands.sum(axis=2)
+        to_discard = np.where(totals > 7, totals // 2, 0)
+        for _ in range(int(to_discard.max(initial=0))):
+            drawing = to_discard > 0
+            self._take_random_card(hands, drawing)
+            to_discard -= drawing
+        self.resources[games] = hands
+
+    def _take_random_card(self, hands, mask):
+        """Zabiera jedną losową kartę (proporcjonalnie do ilości) z rąk wskazanych maską, zwraca zasób"""
+        cumulative = hands.cumsum(axis=-1)
+        pick = self.rng.random(mask.shape) * cumulative[..., -1]
+        resource = (cumulative <= pick[..., None]).sum(axis=-1)
+        mask = mask & (cumulative[..., -1] > 0)
+        index = np.nonzero(mask)
+        hands[index + (resource[index],)] -= 1
+        return np.where(mask, resource, -1)
+
+    def place_robber(self, games, hexes):
+        """Stawia złodzieja i kradnie jedną kartę losowemu sąsiadowi (innemu niż aktualny gracz)"""
+        games = np.asarray(games)
+        hexes = np.asarray(hexes)
+        self.robber_hex[games] = hexes
+
+        owners = self.vertex_owner[games[:, None], HEX_VERTICES[hexes]]  # (gry, 6)
+        thief = self.current_player[games]
+        victims = np.zeros((len(games), self.num_players), dtype=bool)
+        for player_id in range(self.num_players):
+            victims[:, player_id] = (owners == player_id).any(axis=1) & (thief != player_id)
+        has_victim = victims.any(axis=1)
+        victim = np.where(victims, self.rng.random(victims.shape), -1).argmax(axis=1)
+
+        hands = self.resources[games, victim]
+        stolen = self._take_random_card(hands, has_victim)
+        self.resources[games, victim] = hands
+        robbed = stolen >= 0
+        self.resources[games[robbed], thief[robbed], stolen[robbed]] += 1
+
+    def step(self):
+        """Jedna tura we wszystkich grach: rzut, zasoby, a przy 7 odrzucanie i losowy złodziej"""
+        rolls = self.roll_dice()
+        self.distribute_resources(rolls)
+        sevens = np.nonzero(rolls == 7)[0]
+        if len(sevens):
+            self.discard_half(sevens)
+            self.place_robber(sevens, self._random_robber_hexes(sevens))
+        self.current_player = (self.current_player + 1) % self.num_players
+        return rolls
+
+    def _random_robber_hexes(self, games):
+        """Losowy hex inny niż pustynia i obecne miejsce złodzieja"""
+        num_hexes = self.hex_tokens.shape[1]
+        allowed = (self.hex_resources[games] != DESERT) & (np.arange(num_hexes) != self.robber_hex[games, None])
+        return np.where(allowed, self.rng.random(allowed.shape), -1).argmax(axis=1)
+
+    def affordable_builds(self):
+        """Maska (gry, gracze, 3): kogo stać na drogę, wioskę, miasto - jedna operacja na wszystkich"""
+        return affordable_builds(self.resources)
+
+    def run(self, turns):
+        """Kilka tur naraz, zwraca zasoby graczy (gry, gracze, zasoby)"""
+        for _ in range(turns):
+            self.step()
+        return self.resources
@@ -0,0 +1,111 @@
+from .enums import BuildingType
+
+HEX_ROWS = (3, 4, 5, 4, 3)
+
+# Rogi hexa w jednostkach siatki: x * (sqrt(3)/2 * size), y * (size/2)
+# Kolejność jak w grafice, kąty 30, 90, 150, 210, 270, 330 stopni
+HEX_CORNERS = ((1, 1), (0, 2), (-1, 1), (-1, -1), (0, -2), (1, -1))
+
+
+class BoardTopology:
+    """Stała topologia planszy: wierzchołki i krawędzie jako liczby całkowite, sąsiedztwo w tablicach"""
+    __slots__ = ('hex_coords', 'vertex_coords', 'hex_vertices', 'vertex_hexes',
+                 'vertex_neighbors', 'vertex_edges', 'edge_vertices', 'edge_ids')
+
+    def __init__(self, rows=HEX_ROWS):
+        self.hex_coords = []
+        self.vertex_coords = []
+        self.hex_vertices = []
+        self.edge_vertices = []
+        self.edge_ids = {}
+        vertex_ids = {}
+
+        middle = len(rows) // 2
+        for r, count in enumerate(rows):
+            y = 3 * (r - middle)
+            for k in range(count):
+                x = 2 * k - (count - 1)
+                self.hex_coords.append((x, y))
+
+                vertices = []
+                for cx, cy in HEX_CORNERS:
+                    coord = (x + cx, y + cy)
+                    if coord not in vertex_ids:
+                        vertex_ids[coord] = len(self.vertex_coords)
+                        self.vertex_coords.append(coord)
+                    vertices.append(vertex_ids[coord])
+                self.hex_vertices.append(tuple(vertices))
+
+                for i in range(6):
+                    u = vertices[i]
+                    v = vertices[(i + 1) % 6]
+                    if (u, v) not in self.edge_ids:
+                        edge = len(self.edge_vertices)
+                        self.edge_vertices.append((u, v))
+                        self.edge_ids[(u, v)] = edge
+                        self.edge_ids[(v, u)] = edge
+
+        num_vertices = len(self.vertex_coords)
+        vertex_hexes = [[] for _ in range(num_vertices)]
+        for hex_id, vertices in enumerate(self.hex_vertices):
+            for vertex in vertices:
+                vertex_hexes[vertex].append(hex_id)
+
+        neighbors = [[] for _ in range(num_vertices)]
+        vertex_edges = [[] for _ in range(num_vertices)]
+        for edge, (u, v) in enumerate(self.edge_vertices):
+            neighbors[u].append(v)
+            neighbors[v].append(u)
+            vertex_edges[u].append(edge)
+            vertex_edges[v].append(edge)
+
+        self.hex_coords = tuple(self.hex_coords)
+        self.vertex_coords = tuple(self.vertex_coords)
+        self.hex_vertices = tuple(self.hex_vertices)
+        self.edge_vertices = tuple(self.edge_vertices)
+        self.vertex_hexes = tuple(tuple(h) for h in vertex_hexes)
+        self.vertex_neighbors = tuple(tuple(n) for n in neighbors)
+        self.vertex_edges = tuple(tuple(e) for e in vertex_edges)
+
+    @property
+    def num_hexes(self):
+        return len(self.hex_vertices)
+
+    @property
+    def num_vertices(self):
+        return len(self.vertex_coords)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_vertices)
+
+
+# Topologia jest zawsze taka sama, więc liczymy ją tylko raz
+TOPOLOGY = BoardTopology()
+
+
+class Board:
+    """Stan planszy: kto ma co na którym wierzchołku i krawędzi (płaskie listy indeksowane id)"""
+    __slots__ = ('topology', 'vertex_owner', 'vertex_building', 'edge_owner')
+
+    def __init__(self, topology=TOPOLOGY):
+        self.topology = topology
+        self.vertex_owner = [None] * topology.num_vertices
+        self.vertex_building = [BuildingType.NONE] * topology.num_vertices
+        self.edge_owner = [None] * topology.num_edges
+
+    def has_vertex(self, vertex):
+        return isinstance(vertex, int) and 0 <= vertex < len(self.vertex_owner)
+
+    def snapshot(self):
+        return tuple(self.vertex_owner), tuple(self.vertex_building), tuple(self.edge_owner)
+
+    def restore(self, state):
+        vertex_owner, vertex_building, edge_owner = state
+        self.vertex_owner[:] = vertex_owner
+        self.vertex_building[:] = vertex_building
+        self.edge_owner[:] = edge_owner
+
+    def edge_id(self, u, v):
+        """Id krawędzi między dwoma wierzchołkami albo None jak jej nie ma"""
+        return self.topology.edge_ids.get((u, v))
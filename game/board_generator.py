@@ -0,0 +1,114 @@
+"""Losowanie uczciwych plansz: czerwone numerki (6 i 8) nie stykają się, a pipsy są równo rozłożone
+
+Plansze losujemy naraz w tablicach NumPy (jak w batch.py) i odrzucamy te, które łamią zasady.
+Szablon (sąsiedztwo hexów, zasoby, numerki) liczymy raz, więc jedna plansza to kilka mikrosekund.
+"""
+import numpy as np
+
+from .analysis import TOKEN_PIPS
+from .board import TOPOLOGY
+from .constants import RESOURCES, TOKENS, RESOURCE_TYPES
+from .hand import DESERT, HEX_CODES, HEX_NAMES
+
+RED_TOKENS = (6, 8)
+# Średnie pipsy na hex każdego zasobu mogą się różnić od średniej całej planszy najwyżej o tyle
+MAX_PIP_IMBALANCE = 0.75
+MIN_BATCH = 64
+# Mniej więcej taka część losowych plansz spełnia obie zasady, z tego liczymy wielkość partii
+ACCEPT_RATE = 0.03
+
+
+def hex_neighbors(topology=TOPOLOGY):
+    """Pary sąsiednich hexów (mają wspólną krawędź, czyli dwa wierzchołki)"""
+    pairs = []
+    for a, vertices in enumerate(topology.hex_vertices):
+        for b in range(a + 1, topology.num_hexes):
+            if len(set(vertices) & set(topology.hex_vertices[b])) == 2:
+                pairs.append((a, b))
+    return pairs
+
+
+class BoardGenerator:
+    """Losuje plansze spełniające zasady, zwraca zasoby (kody z hand.HEX_CODES) i numerki (0 = brak)
+
+    Najpierw numerki (pustynia to numerek 0) i odrzucenie układów z sąsiednimi 6/8, potem do
+    każdego dobrego układu jedno losowanie zasobów i odrzucenie tych z nierównymi pipsami.
+    Para (numerki, zasoby) jest losowana jak przy zwykłym tasowaniu i tylko odrzucana, więc
+    każda para spełniająca zasady jest tak samo prawdopodobna.
+    """
+
+    def __init__(self, topology=TOPOLOGY, resources=RESOURCES, tokens=TOKENS, max_imbalance=MAX_PIP_IMBALANCE):
+        self.num_hexes = topology.num_hexes
+        self.hex_pairs = np.array(hex_neighbors(topology), dtype=np.intp)
+        codes = np.array([HEX_CODES[resource] for resource in resources], dtype=np.int8)
+        self.land = codes[codes != DESERT]  # Zasoby hexów z numerkiem
+        self.tokens = np.zeros(self.num_hexes, dtype=np.int8)  # Numerki + zera dla pustyń
+        self.tokens[:len(tokens)] = tokens
+        self.pips = np.zeros(13, dtype=np.float64)
+        for token, pips in TOKEN_PIPS.items():
+            self.pips[token] = pips
+        self.resource_counts = np.bincount(self.land, minlength=len(RESOURCE_TYPES)).astype(np.float64)
+        self.mean_pips = self.pips[self.tokens].sum() / len(self.land)
+        self.max_imbalance = max_imbalance
+
+    def sample_tokens(self, count, rng):
+        return self.tokens[rng.random((count, self.num_hexes)).argsort(axis=1)]
+
+    def sample_resources(self, tokens, rng):
+        """Zasoby do gotowych numerków: pustynie tam, gdzie numerek 0"""
+        resources = np.full(tokens.shape, DESERT, dtype=np.int8)
+        order = rng.random((len(tokens), len(self.land))).argsort(axis=1)
+        resources[tokens != 0] = self.land[order].ravel()
+        return resources
+
+    def sample(self, count, rng):
+        """Plansze bez żadnych zasad, jak zwykłe tasowanie"""
+        tokens = self.sample_tokens(count, rng)
+        return self.sample_resources(tokens, rng), tokens
+
+    def red_adjacent(self, tokens):
+        """Dla każdej planszy: czy jakieś dwa czerwone numerki leżą obok siebie"""
+        red = np.isin(tokens, RED_TOKENS)
+        return (red[:, self.hex_pairs[:, 0]] & red[:, self.hex_pairs[:, 1]]).any(axis=1)
+
+    def pip_imbalance(self, resources, tokens):
+        """Największa różnica między średnimi pipsami na hex jednego zasobu a średnią planszy"""
+        num_resources = len(RESOURCE_TYPES)
+        land = resources != DESERT
+        rows = np.broadcast_to(np.arange(len(resources))[:, None], resources.shape)
+        sums = np.bincount(rows[land] * num_resources + resources[land], weights=self.pips[tokens[land]],
+                           minlength=len(resources) * num_resources).reshape(len(resources), num_resources)
+        return np.abs(sums / self.resource_counts - self.mean_pips).max(axis=1)
+
+    def score(self, resources, tokens):
+        """Im mniej tym uczciwiej: nierówność pipsów, a plansza z sąsiednimi 6/8 dostaje inf"""
+        score = self.pip_imbalance(resources, tokens)
+        score[self.red_adjacent(tokens)] = np.inf
+        return score
+
+    def generate(self, count, rng=None):
+        """count plansz spełniających zasady, losowanych partiami i odrzucanych"""
+        rng = np.random.default_rng(rng)
+        resources, tokens = [], []
+        found = 0
+        while found < count:
+            batch_tokens = self.sample_tokens(max(int((count - found) / ACCEPT_RATE), MIN_BATCH), rng)
+            batch_tokens = batch_tokens[~self.red_adjacent(batch_tokens)]
+            batch_resources = self.sample_resources(batch_tokens, rng)
+            fair = self.pip_imbalance(batch_resources, batch_tokens) <= self.max_imbalance
+            resources.append(batch_resources[fair])
+            tokens.append(batch_tokens[fair])
+            found += np.count_nonzero(fair)
+        return np.concatenate(resources)[:count], np.concatenate(tokens)[:count]
+
+
+DEFAULT_GENERATOR = BoardGenerator()
+
+
+def fair_layout(rng, generator=DEFAULT_GENERATOR):
+    """Jedna uczciwa plansza hex po hexie (zasoby, numerki) dla GameState.setup_board_layout
+
+    Losowanie idzie z random.Random gry, więc to samo ziarno daje tę samą planszę.
+    """
+    resources, tokens = generator.generate(1, rng.getrandbits(64))
+    return [HEX_NAMES[code] for code in resources[0]], [int(token) for token in tokens[0]]
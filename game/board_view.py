@@ -0,0 +1,33 @@
+from .utils import (get_hex_positions, rounded_pos, edge_line_data, SpatialGrid,
+                    NODE_THRESHOLD, EDGE_THRESHOLD, HEX_THRESHOLD)
+
+
+class BoardView:
+    """Współrzędne ekranowe planszy, używane tylko przez grafikę i szukanie kliknięć
+
+    Przy tworzeniu budujemy też siatki do szukania kliknięć, więc zapytanie to jedna komórka.
+    """
+
+    def __init__(self, topology, center_x, center_y, size):
+        self.topology = topology
+        self.size = size
+        self.hex_positions = get_hex_positions(center_x, center_y, size)
+
+        unit_x = size * 3 ** 0.5 / 2
+        unit_y = size / 2
+        self.vertex_positions = [rounded_pos((center_x + x * unit_x, center_y + y * unit_y))
+                                 for x, y in topology.vertex_coords]
+        self.edges = topology.edge_vertices
+        self.edge_segments = [(self.vertex_positions[u], self.vertex_positions[v])
+                              for u, v in self.edges]
+        self.edge_data = [edge_line_data(segment) for segment in self.edge_segments]
+
+        self.vertex_grid = SpatialGrid(NODE_THRESHOLD)
+        for vertex, (x, y) in enumerate(self.vertex_positions):
+            self.vertex_grid.insert(vertex, x, y, x, y)
+        self.hex_grid = SpatialGrid(HEX_THRESHOLD)
+        for hex_id, (x, y) in enumerate(self.hex_positions):
+            self.hex_grid.insert(hex_id, x, y, x, y)
+        self.edge_grid = SpatialGrid(EDGE_THRESHOLD)
+        for edge, ((x1, y1), (x2, y2)) in enumerate(self.edge_segments):
+            self.edge_grid.insert(edge, min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
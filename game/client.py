@@ -0,0 +1,89 @@
+"""Zastępczy klient do serwera gry (game/server.py) i test obciążenia
+
+Bot trzyma kopię gry jak prawdziwy klient: dostaje pełny stan przy wejściu, potem nakłada
+różnice (game/diff.py), a w swojej turze wybiera losowy ruch z listy legalnych. Przy okazji
+sprawdza, czy jego kopia daje te same legalne ruchy co serwer (inaczej to rozjazd stanu).
+load_test uruchamia serwer w tym samym procesie i tyle botów, ile jest miejsc przy stołach.
+"""
+import asyncio
+import json
+import random
+import time
+
+from .constants import PLAYERS_NUMBERS, SERVER_BACKLOG, SERVER_HOST, SERVER_MAX_TURNS
+from .diff import apply_diffs, mirror_game
+from .features import action_index
+from .profiling import percentile
+from .server import GameServer, encode_message
+
+
+async def play_bot(host, port, table, rng, latencies=None):
+    """Jeden gracz przy stole table do końca gry, zwraca (kopia gry, zwycięzca, błędy, rozjazdy)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({'type': 'join', 'table': table}))
+    game = winner = None
+    errors = desyncs = 0
+    sent = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            kind = message['type']
+            if kind == 'joined':
+                game = mirror_game(message['state'], message['cards'])
+            elif kind == 'diff':
+                apply_diffs(game, message['diffs'])
+                if sent is not None and latencies is not None:
+                    latencies.append(time.perf_counter() - sent)
+                sent = None
+            elif kind == 'finished':
+                winner = message['winner']
+                break
+            elif kind == 'error':
+                errors += 1
+                sent = None
+            if message.get('legal'):
+                if sorted(action_index(action) for action in game.legal_actions()) != sorted(message['legal']):
+                    desyncs += 1
+                writer.write(encode_message({'type': 'action', 'action': rng.choice(message['legal'])}))
+                sent = time.perf_counter()
+                await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return game, winner, errors, desyncs
+
+
+async def load_test(tables, num_players=PLAYERS_NUMBERS, seed=0, max_turns=SERVER_MAX_TURNS, host=SERVER_HOST):
+    """tables stołów po num_players botów na serwerze w tym samym procesie, zwraca słownik z wynikami"""
+    server = GameServer(num_players, seed=seed, max_turns=max_turns)
+    listener = await server.serve(host, 0, backlog=SERVER_BACKLOG)
+    port = listener.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(
+            play_bot(host, port, f"stol-{table}", random.Random(seed * 1000003 + table * num_players + seat), latencies)
+            for table in range(tables) for seat in range(num_players)))
+    finally:
+        listener.close()
+        await listener.wait_closed()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'tables': tables,
+        'clients': len(results),
+        'seconds': elapsed,
+        'actions': server.stats['actions'],
+        'actions_per_s': server.stats['actions'] / elapsed,
+        'rejected': server.stats['rejected'],
+        'client_errors': sum(result[2] for result in results),
+        'desyncs': sum(result[3] for result in results),
+        'finished_with_winner': sum(result[1] is not None for result in results) // num_players,
+        'messages': server.stats['messages'],
+        'bytes_per_message': server.stats['bytes'] / max(1, server.stats['messages']),
+        'latency_p50_ms': percentile(latencies, 0.5) * 1e3,
+        'latency_p99_ms': percentile(latencies, 0.99) * 1e3,
+    }
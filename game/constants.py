@@ -24,4 +24,37 @@ RESOURCE_COLORS = {
 
 RESOURCES = ['drewno'] * 4 + ['glina'] * 3 + ['zboze'] * 4 + ['owca'] * 4 + ['kamień'] * 3 + ['pustynia']
 TOKENS = [2, 3, 3, 4, 4, 5, 5, 6, 6,
-          8, 8, 9, 9, 10, 10, 11, 11, 12]
\ No newline at end of file
+          8, 8, 9, 9, 10, 10, 11, 11, 12]
+
+RESOURCE_TYPES = ['drewno', 'glina', 'owca', 'zboze', 'kamień']
+
+# Koszty jako wektory w kolejności RESOURCE_TYPES (drewno, glina, owca, zboże, kamień)
+ROAD_COST = (1, 1, 0, 0, 0)
+SETTLEMENT_COST = (1, 1, 1, 1, 0)
+CITY_COST = (0, 0, 0, 2, 3)
+BANK_TRADE_RATE = 4  # Ile trzeba oddać bankowi za 1 zasób
+
+# Ile pionków ma każdy gracz i ile punktów trzeba do wygranej
+MAX_ROADS = 15
+MAX_SETTLEMENTS = 5
+MAX_CITIES = 4
+VICTORY_POINTS_TO_WIN = 10
+# Jak długo pętla gry czeka na zdarzenie zanim i tak sprawdzi stan (ms)
+EVENT_WAIT_TIMEOUT = 1000
+
+# Mierzenie czasu metod i klatek (game/profiling.py), zrzut do pliku co PROFILE_DUMP_INTERVAL sekund
+PROFILING = False
+PROFILE_DUMP_PATH = 'profile.json'
+PROFILE_DUMP_INTERVAL = 10
+
+# Log zdarzeń gry (game/event_log.py): ile trzymamy w pamięci, ile ostatnich widać na ekranie,
+# co ile zdarzeń zapis do pliku
+EVENT_LOG_SIZE = 200
+EVENT_LOG_LINES = 5
+EVENT_BATCH_SIZE = 1000
+
+# Serwer gry (server.py): adres, po ilu turach stół kończy grę bez zwycięzcy
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_MAX_TURNS = 500
+SERVER_BACKLOG = 1024  # Przy teście obciążenia tysiące połączeń przychodzą naraz
@@ -0,0 +1,33 @@
+DICE_SUMS = tuple(range(2, 13))
+# Suma dwóch kostek: 1, 2, ..., 6, ..., 2, 1 na 36 (narastająco dla random.choices)
+DICE_CUM_WEIGHTS = (1, 3, 6, 10, 15, 21, 26, 30, 33, 35, 36)
+DICE_BLOCK_SIZE = 256
+
+
+class DiceStream:
+    """Rzuty dwiema kostkami losowane blokami z generatora gry
+
+    Cały blok to jedno wywołanie random.choices, a pojedynczy rzut to odczyt z krotki.
+    Można też podać z góry gotowe rzuty (np. do odtwarzania gry), potem losuje dalej.
+    """
+    __slots__ = ('rng', 'block_size', 'block', 'position')
+
+    def __init__(self, rng, block_size=DICE_BLOCK_SIZE, rolls=None):
+        self.rng = rng
+        self.block_size = block_size
+        self.block = tuple(rolls) if rolls else ()
+        self.position = 0
+
+    def roll(self):
+        if self.position == len(self.block):
+            self.block = tuple(self.rng.choices(DICE_SUMS, cum_weights=DICE_CUM_WEIGHTS, k=self.block_size))
+            self.position = 0
+        value = self.block[self.position]
+        self.position += 1
+        return value
+
+    def snapshot(self):
+        return self.block, self.position
+
+    def restore(self, state):
+        self.block, self.position = state
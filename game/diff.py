@@ -0,0 +1,90 @@
+"""Różnice stanu gry wysyłane po każdej zmianie i nakładanie ich na kopię gry
+
+Po game.record_diffs() każda zmiana stanu w GameState dopisuje do game.diffs krotkę
+(DiffType, ...) - opis pól jest przy DiffType w enums.py. Są to same liczby i wartości
+logiczne, więc da się je od razu zapisać jako JSON. Odbiorca (renderer, widz, agent w innym
+procesie) trzyma własną kopię gry: raz dostaje pełny stan (encoding.encode_state), a potem
+tylko różnice, które apply_diffs nakłada przez put_settlement / put_road / put_city /
+move_robber - więc indeksy kopii (kandydaci, produkcja, najdłuższa droga) też są aktualne.
+
+Gracz nie powinien znać cudzych kart (np. co zostało ukradzione), więc dla jednego miejsca
+przy stole full_state(game, seat) wysyła cudze ręce puste, a seat_diffs zamienia zmiany
+cudzych rąk na samą zmianę liczby kart (DiffType.CARDS). Kopia z mirror_game trzyma liczby
+kart wszystkich graczy w game.card_counts (w zwykłej grze jest tam None i nic się nie liczy).
+game.version kopii to jej własny licznik zmian (dla renderera), nie ma związku z wersją gry
+na serwerze.
+
+Po game.restore() różnice nie wystarczą, trzeba wysłać pełny stan od nowa.
+"""
+import base64
+
+from .encoding import decode_state, encode_state
+from .enums import BuildingType, DiffType
+from .hand import empty_hand
+
+
+def apply_diff(game, diff):
+    kind = diff[0]
+    if kind == DiffType.VERTEX:
+        _, vertex, owner, building = diff
+        if BuildingType(building) == BuildingType.CITY:
+            game.put_city(vertex, owner)
+        else:
+            game.put_settlement(vertex, owner)
+    elif kind == DiffType.EDGE:
+        game.put_road(diff[1], diff[2])
+    elif kind == DiffType.RESOURCES:
+        hand = game.players[diff[1]]['resources']
+        hand[:] = [have + change for have, change in zip(hand, diff[2])]
+        if game.card_counts is not None:
+            game.card_counts[diff[1]] += sum(diff[2])
+    elif kind == DiffType.CARDS:
+        if game.card_counts is not None:
+            game.card_counts[diff[1]] += diff[2]
+    elif kind == DiffType.ROBBER:
+        game.move_robber(diff[1])
+    elif kind == DiffType.PHASE:
+        (game.current_player_idx, game.initial_placement_phase, game.placement_stage, game.robber_phase,
+         game.initial_placement_complete, order) = diff[1:]
+        game.initial_placement_order = list(order)
+    elif kind == DiffType.DICE:
+        game.diceroll = diff[1]
+    else:
+        raise ValueError(f"Nieznany rodzaj różnicy: {kind}")
+    game.version += 1
+
+
+def apply_diffs(game, diffs):
+    for diff in diffs:
+        apply_diff(game, diff)
+    return game
+
+
+def seat_diffs(diffs, seat):
+    """Różnice, które widzi gracz seat: zmiany cudzych rąk tylko jako zmiana liczby kart"""
+    return [(DiffType.CARDS, diff[1], sum(diff[2])) if diff[0] == DiffType.RESOURCES and diff[1] != seat else diff
+            for diff in diffs]
+
+
+def card_counts(game):
+    return [sum(player['resources']) for player in game.players]
+
+
+def full_state(game, seat=None):
+    """Pełny stan jako napis (base64 z encode_state) - do wysłania raz, na początku
+
+    Z seat cudze ręce są puste, ich liczby kart trzeba wysłać obok (card_counts).
+    """
+    if seat is not None:
+        game = decode_state(encode_state(game))
+        for player in game.players:
+            if player['id'] != seat:
+                player['resources'][:] = empty_hand()
+    return base64.b64encode(encode_state(game)).decode('ascii')
+
+
+def mirror_game(state, cards=None):
+    """Kopia gry z full_state(), na którą potem nakłada się różnice (cards to card_counts przy seat)"""
+    game = decode_state(base64.b64decode(state))
+    game.card_counts = list(cards) if cards is not None else card_counts(game)
+    return game
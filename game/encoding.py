@@ -0,0 +1,303 @@
+"""Binarny zapis stanu gry i plik z zapisem wielu gier (ruch po ruchu)
+
+Stan gry (wersja STATE_VERSION):
+    nagłówek  '<4sBBB'  magia, wersja, liczba graczy, liczba hexów
+    hexy      po bajcie zasób (kod z hand.HEX_CODES), potem po bajcie numerek (0 = brak)
+    gracze    maski bitowe wioski / miasta (wierzchołki) i drogi (krawędzie), potem PLAYER_FORMAT
+    faza      PHASE_FORMAT i kolejność fazy początkowej (po bajcie)
+
+Plik z grami: nagłówek pliku, a po nim tylko dopisywane rekordy po 4 bajty (ACTION_FORMAT).
+Rekord z typem GAME_START zaczyna nową grę i ma za sobą ziarno i zapisany stan początkowy,
+reszta to ruchy. Plik czytamy przez mmap, więc nawet duże archiwum nie trafia w całości do pamięci.
+"""
+import mmap
+import os
+import struct
+
+from .enums import ActionType, BuildingType, Resource
+from .game_state import GameState, create_game
+from .hand import HEX_CODES, HEX_NAMES, NUM_RESOURCES
+
+STATE_MAGIC = b'CTNS'
+STATE_VERSION = 1
+RECORD_MAGIC = b'CTNR'
+RECORD_VERSION = 1
+
+STATE_HEADER = struct.Struct('<4sBBB')
+# Zasoby (5 x uint16), punkty, najdłuższa droga, pozostałe drogi, wioski, miasta
+PLAYER_FORMAT = struct.Struct('<%dHBBBBB' % NUM_RESOURCES)
+# Aktualny gracz, flagi, etap rozstawiania, rzut, złodziej, etap wymiany, zasób do wymiany, długość kolejki
+PHASE_FORMAT = struct.Struct('<BBBBBBBB')
+RECORD_HEADER = struct.Struct('<4sB')
+ACTION_FORMAT = struct.Struct('<BBBB')  # typ, gracz, argument, drugi argument
+GAME_FORMAT = struct.Struct('<BqI')  # flagi GAME_*, ziarno, długość zapisanego stanu
+
+NONE_BYTE = 255
+GAME_START = 0  # Wartości ActionType zaczynają się od 1
+
+GAME_SEED = 1  # Gra ma ziarno
+GAME_FAIR = 2  # Plansza z board_generator (create_game(fair=True))
+
+FLAG_INITIAL_PHASE = 1
+FLAG_INITIAL_COMPLETE = 2
+FLAG_ROBBER_PHASE = 4
+FLAG_TRADING = 8
+
+
+def _mask_size(count):
+    return (count + 7) // 8
+
+
+def _byte_or_none(value):
+    return NONE_BYTE if value is None else value
+
+
+def _none_or_value(value):
+    return None if value == NONE_BYTE else value
+
+
+def encode_state(game):
+    """Cały stan gry jako bytes (bez indeksów pomocniczych i bez stanu generatora losowego)"""
+    board = game.board
+    topology = board.topology
+    players = game.players
+    num_players = len(players)
+
+    parts = [STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, num_players, len(game.hexes))]
+    parts.append(bytes(HEX_CODES[hex_data['resource']] for hex_data in game.hexes))
+    parts.append(bytes(hex_data['token'] or 0 for hex_data in game.hexes))
+
+    settlements = [0] * num_players
+    cities = [0] * num_players
+    roads = [0] * num_players
+    for vertex, owner in enumerate(board.vertex_owner):
+        if owner is None:
+            continue
+        if board.vertex_building[vertex] == BuildingType.CITY:
+            cities[owner] |= 1 << vertex
+        else:
+            settlements[owner] |= 1 << vertex
+    for edge, owner in enumerate(board.edge_owner):
+        if owner is not None:
+            roads[owner] |= 1 << edge
+
+    vertex_bytes = _mask_size(topology.num_vertices)
+    edge_bytes = _mask_size(topology.num_edges)
+    for player in players:
+        player_id = player['id']
+        parts.append(settlements[player_id].to_bytes(vertex_bytes, 'little'))
+        parts.append(cities[player_id].to_bytes(vertex_bytes, 'little'))
+        parts.append(roads[player_id].to_bytes(edge_bytes, 'little'))
+        parts.append(PLAYER_FORMAT.pack(*player['resources'],
+                                        player['victory_points'], player['longest_road'], player['roads_left'],
+                                        player['settlements_left'], player['cities_left']))
+
+    flags = ((FLAG_INITIAL_PHASE if game.initial_placement_phase else 0) |
+             (FLAG_INITIAL_COMPLETE if game.initial_placement_complete else 0) |
+             (FLAG_ROBBER_PHASE if game.robber_phase else 0) |
+             (FLAG_TRADING if game.trading_mode else 0))
+    selected = game.selected_trade_resource
+    parts.append(PHASE_FORMAT.pack(game.current_player_idx, flags, game.placement_stage,
+                                   game.diceroll or 0, _byte_or_none(game.robber_hex), game.trade_stage,
+                                   NONE_BYTE if selected is None else selected,
+                                   len(game.initial_placement_order)))
+    parts.append(bytes(game.initial_placement_order))
+    return b''.join(parts)
+
+
+def decode_state(data, game=None, rng=None):
+    """Odtwarza GameState z encode_state()
+
+    Bez game tworzy nową grę z planszą z zapisu. Z game wczytuje stan do istniejącej gry
+    (plansza musi się zgadzać), a jej generator losowy zostaje jaki był.
+    """
+    data = memoryview(data)
+    magic, version, num_players, num_hexes = STATE_HEADER.unpack_from(data, 0)
+    if magic != STATE_MAGIC:
+        raise ValueError("To nie jest zapis stanu gry")
+    if version != STATE_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja zapisu stanu: {version}")
+    offset = STATE_HEADER.size
+
+    resources = [HEX_NAMES[code] for code in data[offset:offset + num_hexes]]
+    offset += num_hexes
+    tokens = [token or None for token in data[offset:offset + num_hexes]]
+    offset += num_hexes
+
+    if game is None:
+        game = GameState(rng)
+        for _ in range(num_players):
+            game.add_player()
+        game.setup_board_layout(resources, tokens)
+    elif (len(game.players) != num_players or
+          [hex_data['resource'] for hex_data in game.hexes] != resources or
+          [hex_data['token'] for hex_data in game.hexes] != tokens):
+        raise ValueError("Zapis stanu jest z innej planszy")
+
+    board = game.board
+    topology = board.topology
+    vertex_bytes = _mask_size(topology.num_vertices)
+    edge_bytes = _mask_size(topology.num_edges)
+    board.vertex_owner[:] = [None] * topology.num_vertices
+    board.vertex_building[:] = [BuildingType.NONE] * topology.num_vertices
+    board.edge_owner[:] = [None] * topology.num_edges
+
+    for player in game.players:
+        player_id = player['id']
+        masks = []
+        for size in (vertex_bytes, vertex_bytes, edge_bytes):
+            masks.append(int.from_bytes(data[offset:offset + size], 'little'))
+            offset += size
+        settlements, cities, roads = masks
+        for vertex in range(topology.num_vertices):
+            if (settlements | cities) >> vertex & 1:
+                board.vertex_owner[vertex] = player_id
+                board.vertex_building[vertex] = (BuildingType.CITY if cities >> vertex & 1
+                                                 else BuildingType.SETTLEMENT)
+        for edge in range(topology.num_edges):
+            if roads >> edge & 1:
+                board.edge_owner[edge] = player_id
+
+        values = PLAYER_FORMAT.unpack_from(data, offset)
+        offset += PLAYER_FORMAT.size
+        counts = values[:NUM_RESOURCES]
+        player['resources'] = list(counts)
+        (player['victory_points'], longest_road, player['roads_left'],
+         player['settlements_left'], player['cities_left']) = values[NUM_RESOURCES:]
+        player['longest_road'] = bool(longest_road)
+
+    (game.current_player_idx, flags, game.placement_stage, diceroll, robber_hex, game.trade_stage,
+     selected, order_length) = PHASE_FORMAT.unpack_from(data, offset)
+    offset += PHASE_FORMAT.size
+    game.initial_placement_order = list(data[offset:offset + order_length])
+    game.initial_placement_phase = bool(flags & FLAG_INITIAL_PHASE)
+    game.initial_placement_complete = bool(flags & FLAG_INITIAL_COMPLETE)
+    game.robber_phase = bool(flags & FLAG_ROBBER_PHASE)
+    game.trading_mode = bool(flags & FLAG_TRADING)
+    game.diceroll = diceroll or None
+    game.robber_hex = _none_or_value(robber_hex)
+    game.selected_trade_resource = None if selected == NONE_BYTE else Resource(selected)
+
+    game.rebuild_indexes()
+    return game
+
+
+def encode_action(action, player_id):
+    """Ruch z legal_actions() jako 4 bajty"""
+    action_type = action[0]
+    if action_type == ActionType.TRADE:
+        return ACTION_FORMAT.pack(action_type.value, player_id,
+                                  action[1], action[2])
+    argument = action[1] if len(action) > 1 else 0
+    return ACTION_FORMAT.pack(action_type.value, player_id, argument, 0)
+
+
+def decode_action(code, argument, second):
+    action_type = ActionType(code)
+    if action_type == ActionType.TRADE:
+        return action_type, Resource(argument), Resource(second)
+    if action_type == ActionType.END_TURN:
+        return (action_type,)
+    return action_type, argument
+
+
+def encode_game_start(game, seed=None, fair=False):
+    """Rekord zaczynający grę: ziarno (jeśli jest), rodzaj planszy i stan, od którego lecą ruchy"""
+    state = encode_state(game)
+    flags = (GAME_SEED if seed is not None else 0) | (GAME_FAIR if fair else 0)
+    return (ACTION_FORMAT.pack(GAME_START, 0, 0, 0) +
+            GAME_FORMAT.pack(flags, seed or 0, len(state)) + state)
+
+
+class GameRecordWriter:
+    """Dopisuje gry i ruchy na koniec pliku (nagłówek pliku tylko gdy plik jest pusty)"""
+
+    def __init__(self, path):
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION))
+
+    def start_game(self, game, seed=None, fair=False):
+        self.file.write(encode_game_start(game, seed, fair))
+
+    def add_action(self, action, player_id):
+        self.file.write(encode_action(action, player_id))
+
+    def write(self, data):
+        """Gotowe rekordy, np. złożone w innym procesie z encode_game_start() i encode_action()"""
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_record_fits(offset, length, size):
+    """Rekord ucięty na końcu pliku (np. przerwany zapis) to błąd, a nie struct.error"""
+    if offset + length > size:
+        raise ValueError(f"Ucięty rekord na końcu pliku z grami (bajt {offset} z {size})")
+
+
+def read_games(path):
+    """Generator po grach z pliku: (ziarno albo None, czy uczciwa plansza, zapisany stan, lista (gracz, ruch))"""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        if size < RECORD_HEADER.size:
+            raise ValueError("To nie jest plik z zapisem gier")
+        magic, version = RECORD_HEADER.unpack_from(data, 0)
+        if magic != RECORD_MAGIC:
+            raise ValueError("To nie jest plik z zapisem gier")
+        if version != RECORD_VERSION:
+            raise ValueError(f"Nieobsługiwana wersja pliku z grami: {version}")
+
+        offset = RECORD_HEADER.size
+        game = None
+        while offset < size:
+            _check_record_fits(offset, ACTION_FORMAT.size, size)
+            code, player_id, argument, second = ACTION_FORMAT.unpack_from(data, offset)
+            offset += ACTION_FORMAT.size
+            if code != GAME_START:
+                if game is None:
+                    raise ValueError("Ruch przed początkiem gry")
+                game[3].append((player_id, decode_action(code, argument, second)))
+                continue
+            if game is not None:
+                yield game
+            _check_record_fits(offset, GAME_FORMAT.size, size)
+            flags, seed, length = GAME_FORMAT.unpack_from(data, offset)
+            offset += GAME_FORMAT.size
+            _check_record_fits(offset, length, size)
+            state = bytes(data[offset:offset + length])
+            game = (seed if flags & GAME_SEED else None, bool(flags & GAME_FAIR), state, [])
+            offset += length
+        if game is not None:
+            yield game
+
+
+def state_num_players(state):
+    return STATE_HEADER.unpack_from(state, 0)[2]
+
+
+def replay_game(seed, fair, state, actions, listeners=()):
+    """Rozgrywa zapisaną grę od nowa, zwraca generator (ruch, gra po ruchu)
+
+    Gra odtwarzana jest przez create_game z tym samym ziarnem, więc stan początkowy musi być
+    zapisany zanim gra użyła generatora poza create_game (rzuty, kradzież, odrzucanie).
+    listeners są podpinane do gry przed pierwszym ruchem.
+    """
+    if seed is None:
+        raise ValueError("Bez ziarna nie da się powtórzyć rzutów kostkami")
+    game = decode_state(state, create_game(state_num_players(state), rng=seed, fair=fair))
+    for listener in listeners:
+        game.add_listener(listener)
+    for player_id, action in actions:
+        if player_id != game.current_player_idx or not game.apply_action(action):
+            raise ValueError(f"Zapisany ruch {action} gracza {player_id} nie pasuje do stanu gry")
+        yield action, game
@@ -1,6 +1,48 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 class BuildingType(Enum):
     NONE = auto()
     SETTLEMENT = auto()
     CITY = auto()
+
+class Resource(IntEnum):
+    """Zasoby w kolejności RESOURCE_TYPES - wartość to miejsce w wektorze ręki gracza"""
+    DREWNO = 0
+    GLINA = 1
+    OWCA = 2
+    ZBOZE = 3
+    KAMIEN = 4
+
+class ActionType(Enum):
+    SETTLEMENT = auto()
+    ROAD = auto()
+    CITY = auto()
+    TRADE = auto()
+    ROBBER = auto()
+    END_TURN = auto()
+
+class EventType(Enum):
+    DICE_ROLLED = auto()
+    PRODUCTION = auto()
+    DISCARD = auto()
+    ROBBER_MOVED = auto()
+    STEAL = auto()
+    SETTLEMENT_BUILT = auto()
+    ROAD_BUILT = auto()
+    CITY_BUILT = auto()
+    TRADE = auto()
+    LONGEST_ROAD = auto()
+    TURN_ENDED = auto()
+    ROBBER_ACTIVATED = auto()
+    DISCARD_REQUIRED = auto()
+    CANNOT_AFFORD = auto()
+
+class DiffType(IntEnum):
+    """Rodzaje różnic stanu gry (game/diff.py), jako liczby żeby dało się je od razu wysłać"""
+    VERTEX = 1     # wierzchołek, właściciel, BuildingType.value
+    EDGE = 2       # krawędź, właściciel
+    RESOURCES = 3  # gracz, zmiana ilości każdego zasobu (wektor jak ręka)
+    ROBBER = 4     # hex
+    PHASE = 5      # aktualny gracz, faza początkowa, etap rozstawiania, złodziej, koniec rozstawiania, kolejka
+    DICE = 6       # wynik rzutu
+    CARDS = 7      # gracz, zmiana liczby kart (RESOURCES cudzego gracza po diff.seat_diffs)
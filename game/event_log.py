@@ -0,0 +1,125 @@
+"""Odbiorniki zdarzeń gry zamiast printów w GameState
+
+Odbiornik to listener do GameState.add_listener: dostaje (EventType, dane) i trzyma je
+w surowej postaci. Tekst robi format_event dopiero wtedy, gdy ktoś zdarzenia czyta
+(napisy w UI, zapis do pliku), więc sama gra nie płaci ani za formatowanie, ani za wypisywanie.
+
+    RingBufferSink   - ostatnie zdarzenia w pamięci, do wyświetlania w grze
+    BatchedFileSink  - dopisuje do pliku paczkami po batch_size zdarzeń (simulate.py i server.py
+                       z --event-log)
+"""
+import functools
+from collections import deque
+
+from .constants import BANK_TRADE_RATE, EVENT_LOG_SIZE, EVENT_BATCH_SIZE, RESOURCE_TYPES
+from .enums import ActionType, EventType
+
+# Czego nie stać gracza przy CANNOT_AFFORD
+ITEM_NAMES = {ActionType.SETTLEMENT: 'wioskę', ActionType.ROAD: 'drogę', ActionType.CITY: 'miasto',
+              ActionType.TRADE: 'wymianę'}
+
+
+def _cannot_afford(d):
+    text = f"Gracz {d['player'] + 1}: nie stać cię na {ITEM_NAMES[d['item']]}"
+    if 'need' in d:
+        text += f" (potrzeba {d['need']} {RESOURCE_TYPES[d['resource']]})"
+    return text
+
+
+# Teksty zdarzeń, numery graczy od 1 jak na ekranie, zasoby (Resource) po nazwie
+MESSAGES = {
+    EventType.DICE_ROLLED: lambda d: f"Gracz {d['player'] + 1} wyrzucił: {d['roll']}",
+    EventType.PRODUCTION: lambda d: f"Gracz {d['player'] + 1} dostał {d['amount']} {RESOURCE_TYPES[d['resource']]}",
+    EventType.ROBBER_ACTIVATED: lambda d: "Wyrzucił się złodziej, wybierz pole gdzie go postawić",
+    EventType.DISCARD_REQUIRED: lambda d: f"Gracz {d['player'] + 1} musi odrzucić {d['count']} zasobów",
+    EventType.DISCARD: lambda d: f"Gracz {d['player'] + 1} odrzucił {d['count']} {RESOURCE_TYPES[d['resource']]}",
+    EventType.ROBBER_MOVED: lambda d: f"Gracz {d['player'] + 1} postawił złodzieja na polu {d['hex']}",
+    EventType.STEAL: lambda d: f"Gracz {d['player'] + 1} ukradł 1 {RESOURCE_TYPES[d['resource']]} od Gracza {d['victim'] + 1}",
+    EventType.SETTLEMENT_BUILT: lambda d: f"Gracz {d['player'] + 1} postawił wioskę",
+    EventType.ROAD_BUILT: lambda d: f"Gracz {d['player'] + 1} położył drogę",
+    EventType.CITY_BUILT: lambda d: f"Gracz {d['player'] + 1} ulepszył wioskę do miasta",
+    EventType.CANNOT_AFFORD: _cannot_afford,
+    EventType.TRADE: lambda d: f"Gracz {d['player'] + 1} wymienił {BANK_TRADE_RATE} {RESOURCE_TYPES[d['give']]} na 1 {RESOURCE_TYPES[d['take']]}",
+    EventType.LONGEST_ROAD: lambda d: (f"Gracz {d['player'] + 1}: ma najdłuższą drogę : {d['length']}"
+                                       if d['player'] is not None else "Nikt nie ma najdłuższej drogi"),
+    EventType.TURN_ENDED: lambda d: f"Gracz {d['player'] + 1} kończy turę",
+}
+
+# Zdarzenia, które wcześniej gra wypisywała - domyślnie tylko te idą do logu
+LOG_EVENTS = frozenset({
+    EventType.DICE_ROLLED, EventType.ROBBER_ACTIVATED, EventType.DISCARD_REQUIRED, EventType.STEAL,
+    EventType.CANNOT_AFFORD, EventType.TRADE, EventType.LONGEST_ROAD,
+})
+
+
+def format_event(event_type, data):
+    return MESSAGES[event_type](data)
+
+
+def _log_line(source, event_type, data):
+    line = f"{event_type.name}\t{format_event(event_type, data)}\n"
+    return line if source is None else f"{source}\t{line}"
+
+
+class RingBufferSink:
+    """Ostatnie capacity zdarzeń z types (None = wszystkie), starsze wypadają same"""
+
+    def __init__(self, capacity=EVENT_LOG_SIZE, types=LOG_EVENTS):
+        self.events = deque(maxlen=capacity)
+        self.types = types
+
+    def __call__(self, event_type, data):
+        if self.types is None or event_type in self.types:
+            self.events.append((event_type, data))
+
+    def messages(self, last=None):
+        """Teksty ostatnich last zdarzeń (wszystkich z bufora przy None), od najstarszego"""
+        events = self.events
+        if last is not None:
+            events = list(events)[-last:] if last else []
+        return [format_event(event_type, data) for event_type, data in events]
+
+    def clear(self):
+        self.events.clear()
+
+
+class BatchedFileSink:
+    """Zdarzenia czekają w liście i są formatowane i zapisywane razem co batch_size
+
+    Reszta jest zapisywana w flush()/close(), najlepiej używać jako context managera.
+    Kiedy do jednego pliku piszą zdarzenia wielu gier naraz (stoły na serwerze), każda gra
+    dostaje listener(nazwa) i jej linie zaczynają się od tej nazwy.
+    """
+
+    def __init__(self, path, batch_size=EVENT_BATCH_SIZE, types=LOG_EVENTS):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.batch_size = batch_size
+        self.types = types
+        self.pending = []
+
+    def __call__(self, event_type, data, source=None):
+        if self.types is None or event_type in self.types:
+            self.pending.append((source, event_type, data))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def listener(self, source):
+        """Listener do GameState.add_listener, który oznacza zdarzenia nazwą source"""
+        return functools.partial(self, source=source)
+
+    def flush(self):
+        if self.pending:
+            self.file.write("".join(_log_line(*event) for event in self.pending))
+            self.pending.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,170 @@
+"""Cechy stanu gry jako tablice NumPy o stałych wymiarach (dla agentów) i QUBO do stawiania wiosek
+
+Wymiary nie zależą od liczby graczy w grze (zawsze MAX_PLAYERS), więc stany z różnych gier
+można układać w jeden batch. Ruchy mają stałą numerację (ACTION_SIZE), maska legalnych ruchów
+i action_index / index_to_action tłumaczą między nią a krotkami z legal_actions().
+"""
+import numpy as np
+
+from .board import TOPOLOGY
+from .constants import PLAYER_COLORS
+from .dice import DICE_SUMS
+from .enums import ActionType, BuildingType, Resource
+from .hand import HEX_CODES, HEX_NAMES, NUM_RESOURCES
+
+MAX_PLAYERS = len(PLAYER_COLORS)
+NUM_VERTICES = TOPOLOGY.num_vertices
+NUM_EDGES = TOPOLOGY.num_edges
+NUM_HEXES = TOPOLOGY.num_hexes
+
+BUILDING_INDEX = {BuildingType.NONE: 0, BuildingType.SETTLEMENT: 1, BuildingType.CITY: 2}
+
+# Numeracja ruchów: wioski, drogi, miasta, wymiany (dawany x brany), złodziej, koniec tury
+SETTLEMENT_OFFSET = 0
+ROAD_OFFSET = SETTLEMENT_OFFSET + NUM_VERTICES
+CITY_OFFSET = ROAD_OFFSET + NUM_EDGES
+TRADE_OFFSET = CITY_OFFSET + NUM_VERTICES
+ROBBER_OFFSET = TRADE_OFFSET + NUM_RESOURCES * NUM_RESOURCES
+END_TURN_INDEX = ROBBER_OFFSET + NUM_HEXES
+ACTION_SIZE = END_TURN_INDEX + 1
+
+ACTION_OFFSETS = {
+    ActionType.SETTLEMENT: SETTLEMENT_OFFSET,
+    ActionType.ROAD: ROAD_OFFSET,
+    ActionType.CITY: CITY_OFFSET,
+    ActionType.ROBBER: ROBBER_OFFSET,
+}
+
+# Nazwa -> (kształt bez wymiaru batcha, dtype)
+FEATURE_SHAPES = {
+    'vertex_owner': ((NUM_VERTICES, MAX_PLAYERS), np.float32),
+    'vertex_building': ((NUM_VERTICES, len(BUILDING_INDEX)), np.float32),
+    'edge_owner': ((NUM_EDGES, MAX_PLAYERS), np.float32),
+    'hex_resource': ((NUM_HEXES, len(HEX_NAMES)), np.float32),
+    'hex_token': ((NUM_HEXES, len(DICE_SUMS)), np.float32),
+    'hex_robber': ((NUM_HEXES,), np.float32),
+    'resources': ((MAX_PLAYERS, NUM_RESOURCES), np.float32),
+    # Punkty, najdłuższa droga, zostałe drogi, wioski, miasta
+    'player_stats': ((MAX_PLAYERS, 5), np.float32),
+    'current_player': ((MAX_PLAYERS,), np.float32),
+    # Faza początkowa, etap rozstawiania, złodziej
+    'phase': ((3,), np.float32),
+    'action_mask': ((ACTION_SIZE,), np.bool_),
+}
+
+
+def action_index(action):
+    """Numer ruchu (krotki z legal_actions) w masce"""
+    action_type = action[0]
+    if action_type == ActionType.END_TURN:
+        return END_TURN_INDEX
+    if action_type == ActionType.TRADE:
+        return TRADE_OFFSET + action[1] * NUM_RESOURCES + action[2]
+    return ACTION_OFFSETS[action_type] + action[1]
+
+
+def index_to_action(index):
+    """Odwrotność action_index"""
+    if index == END_TURN_INDEX:
+        return (ActionType.END_TURN,)
+    if index >= ROBBER_OFFSET:
+        return ActionType.ROBBER, index - ROBBER_OFFSET
+    if index >= TRADE_OFFSET:
+        give, take = divmod(index - TRADE_OFFSET, NUM_RESOURCES)
+        return ActionType.TRADE, Resource(give), Resource(take)
+    if index >= CITY_OFFSET:
+        return ActionType.CITY, index - CITY_OFFSET
+    if index >= ROAD_OFFSET:
+        return ActionType.ROAD, index - ROAD_OFFSET
+    return ActionType.SETTLEMENT, index - SETTLEMENT_OFFSET
+
+
+def empty_features(batch_size):
+    return {name: np.zeros((batch_size,) + shape, dtype=dtype) for name, (shape, dtype) in FEATURE_SHAPES.items()}
+
+
+def write_features(game, features, index):
+    """Wpisuje cechy gry do wiersza index tablic z empty_features() (muszą być wyzerowane)"""
+    board = game.board
+    vertices = np.arange(NUM_VERTICES)
+    owners = np.array([-1 if owner is None else owner for owner in board.vertex_owner])
+    owned = owners >= 0
+    features['vertex_owner'][index, vertices[owned], owners[owned]] = 1
+    buildings = [BUILDING_INDEX[building] for building in board.vertex_building]
+    features['vertex_building'][index, vertices, buildings] = 1
+
+    edges = np.arange(NUM_EDGES)
+    owners = np.array([-1 if owner is None else owner for owner in board.edge_owner])
+    owned = owners >= 0
+    features['edge_owner'][index, edges[owned], owners[owned]] = 1
+
+    for hex_data in game.hexes:
+        hex_id = hex_data['id']
+        features['hex_resource'][index, hex_id, HEX_CODES[hex_data['resource']]] = 1
+        if hex_data['token']:
+            features['hex_token'][index, hex_id, hex_data['token'] - DICE_SUMS[0]] = 1
+    if game.robber_hex is not None:
+        features['hex_robber'][index, game.robber_hex] = 1
+
+    for player in game.players:
+        player_id = player['id']
+        features['resources'][index, player_id] = player['resources']
+        features['player_stats'][index, player_id] = (player['victory_points'], player['longest_road'],
+                                                      player['roads_left'], player['settlements_left'],
+                                                      player['cities_left'])
+    features['current_player'][index, game.current_player_idx] = 1
+    features['phase'][index] = (game.initial_placement_phase, game.placement_stage, game.robber_phase)
+    features['action_mask'][index, [action_index(action) for action in game.legal_actions()]] = True
+
+
+def state_features(game):
+    """Cechy jednego stanu, słownik nazwa -> tablica (kształty w FEATURE_SHAPES)"""
+    features = empty_features(1)
+    write_features(game, features, 0)
+    return {name: array[0] for name, array in features.items()}
+
+
+def batch_features(games):
+    """Cechy wielu stanów naraz, każda tablica ma z przodu wymiar batcha"""
+    features = empty_features(len(games))
+    for index, game in enumerate(games):
+        write_features(game, features, index)
+    return features
+
+
+def vertex_values(game, resource_weights=None):
+    """Wartość każdego wierzchołka: pipsy z sąsiednich hexów (bez złodzieja), opcjonalnie z wagami
+
+    resource_weights to słownik Resource -> waga (brakujące zasoby mają wagę 1).
+    """
+    pips = np.array(game.analysis.vertex_pips, dtype=np.float64)
+    if resource_weights:
+        pips *= [resource_weights.get(resource, 1.0) for resource in Resource]
+    return pips.sum(axis=1)
+
+
+def build_settlement_qubo(game, count=1, resource_weights=None, penalty=None):
+    """QUBO wyboru count wiosek na wolnych wierzchołkach: min x^T Q x po x z {0, 1}
+
+    Zmienne to wolne wierzchołki (zwracane razem z Q, w tej kolejności). Na przekątnej jest
+    minus wartość wierzchołka, kara za dwie wioski obok siebie i kara (suma x - count)^2,
+    więc energia zgadza się z celem z dokładnością do stałej penalty * count^2.
+    Q jest górnotrójkątna.
+    """
+    candidates = sorted(game.free_vertices)
+    position = {vertex: i for i, vertex in enumerate(candidates)}
+    values = vertex_values(game, resource_weights)[candidates]
+    if penalty is None:
+        # Większa niż każda możliwa korzyść z łamania zasad
+        penalty = 2.0 * float(values.max(initial=0.0)) + 1.0
+
+    size = len(candidates)
+    qubo = np.triu(np.full((size, size), 2.0 * penalty), k=1)
+    qubo[np.diag_indices(size)] = -values + penalty * (1 - 2 * count)
+    for vertex in candidates:
+        i = position[vertex]
+        for neighbor in TOPOLOGY.vertex_neighbors[vertex]:
+            j = position.get(neighbor)
+            if j is not None and i < j:
+                qubo[i, j] += penalty
+    return qubo, candidates
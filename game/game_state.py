@@ -1,47 +1,136 @@
 import random
-import networkx as nx
 from collections import defaultdict
-from .constants import PLAYER_COLORS
-from .enums import BuildingType
+from .analysis import BoardAnalysis
+from .board import Board
+from .board_generator import fair_layout
+from .constants import (PLAYER_COLORS, MAX_ROADS, MAX_SETTLEMENTS, MAX_CITIES, VICTORY_POINTS_TO_WIN,
+                        PLAYERS_NUMBERS, RESOURCES, TOKENS, ROAD_COST, SETTLEMENT_COST, CITY_COST,
+                        BANK_TRADE_RATE)
+from .dice import DiceStream
+from .enums import ActionType, BuildingType, DiffType, EventType, Resource
+from .features import state_features
+from .hand import can_afford, empty_hand, pay
+from .longest_road import LongestRoadTracker
+from .production import ProductionIndex
+from .robber import draw_from_counts, robber_targets, robber_victims
 
 class GameState:
-    def __init__(self):
-        self.graph = nx.Graph()
+    def __init__(self, rng=None, dice_rolls=None):
+        """rng to ziarno albo gotowy random.Random - cała losowość gry idzie przez niego
+
+        dice_rolls to opcjonalne gotowe rzuty kostkami, zużywane zanim zacznie się losowanie
+        """
+        self.rng = rng if isinstance(rng, random.Random) else random.Random(rng)
+        self.dice = DiceStream(self.rng, rolls=dice_rolls)
+        self.version = 0  # Rośnie przy każdej zmianie stanu, po tym UI wie czy rysować od nowa
+        self.board = Board()
+        self.longest_roads = LongestRoadTracker(self.board)
         self.players = []
+        self.road_networks = []  # Dla każdego gracza: końce jego dróg + jego wioski/miasta
+        # Kandydaci do legal_actions, aktualizowani przy każdej budowie
+        self.free_vertices = set(range(self.board.topology.num_vertices))  # Spełniają zasadę odległości
+        self.road_candidates = []  # Dla każdego gracza: wolne krawędzie przy jego sieci
+        self.settlements = []  # Dla każdego gracza: wioski, które można ulepszyć
         self.current_player_idx = 0
         self.hexes = []
+        self.production = None  # Indeks produkcji, tworzony razem z planszą
+        self.analysis = None  # Pipsy wierzchołków i graczy, też tworzone razem z planszą
         self.initial_placement_phase = True
         self.initial_placement_order = []  # np. [1,2,3,4,4,3,2,1] jak w Catanie
         self.placement_stage = 0  # 0 = settlement, 1 = road
         self.initial_placement_complete = False # Czy faza jest skończona
         self.diceroll = None
-        self.robber_position = None # Pozycja tegop hexa, na którym jest złodziej
         self.robber_phase = False # Dodatkowa flaga
-        self.robber_hex = None  # To jest hex, na którym jest aktualnie złodziej
-        self.longest_road_length = 4
+        self.robber_hex = None  # Id hexa, na którym jest aktualnie złodziej
         self.trading_mode = False
         self.trade_stage = 0  # 0 wybieramy zasób który chcemy, 1 - zasób które chcemy wymienić
         self.selected_trade_resource = None
+        self.listeners = []  # Funkcje wołane z każdym zdarzeniem (EventType, dane)
+        self.card_counts = None  # Kopia gry u gracza (diff.mirror_game): ile kart ma każdy gracz
+        self.diffs = None  # Różnice stanu do wysłania (opis w game/diff.py), None = nie zbieramy
+
+    def record_diffs(self):
+        """Od teraz każda zmiana stanu dopisuje do self.diffs krotkę (DiffType, ...)"""
+        if self.diffs is None:
+            self.diffs = []
+
+    def take_diffs(self):
+        """Różnice zebrane od ostatniego wywołania"""
+        diffs = self.diffs or []
+        if self.diffs is not None:
+            self.diffs = []
+        return diffs
+
+    def _diff_resources(self, player_id, delta):
+        if self.diffs is not None and any(delta):
+            self.diffs.append((DiffType.RESOURCES, player_id, tuple(delta)))
+
+    def _diff_phase(self):
+        if self.diffs is not None:
+            self.diffs.append((DiffType.PHASE, self.current_player_idx, self.initial_placement_phase,
+                               self.placement_stage, self.robber_phase, self.initial_placement_complete,
+                               tuple(self.initial_placement_order)))
+
+    def add_listener(self, listener):
+        """listener(event_type, data) dostaje każdą zmianę stanu gry jako zdarzenie"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _emit(self, event_type, **data):
+        for listener in self.listeners:
+            listener(event_type, data)
 
     def add_player(self):
         player_id = len(self.players)
         self.players.append({
             'id': player_id,
             'color': PLAYER_COLORS[player_id % len(PLAYER_COLORS)],
-            'resources': defaultdict(int),
+            'resources': empty_hand(),  # Ile czego ma, indeksowane przez Resource
             'victory_points': 0,
-            'longest_road': False
+            'longest_road': False,
+            'roads_left': MAX_ROADS,
+            'settlements_left': MAX_SETTLEMENTS,
+            'cities_left': MAX_CITIES
         })
+        self.road_networks.append(set())
+        self.road_candidates.append(set())
+        self.settlements.append(set())
         return player_id
 
+    def setup_board(self, resource_list, token_list):
+        """Rozkładamy zasoby i numerki na hexy (zdejmowane z końca list, jak przy tasowaniu)"""
+        self.hexes = []
+        for hex_id, vertices in enumerate(self.board.topology.hex_vertices):
+            res = resource_list.pop()
+            token = None if res == 'pustynia' else token_list.pop()
+            self.hexes.append({
+                'id': hex_id,
+                'resource': res,
+                'token': token,
+                'vertices': vertices
+            })
+        self.production = ProductionIndex(self.hexes, self.board.topology, self.robber_hex)
+        self.analysis = BoardAnalysis(self.hexes, self.board.topology, self.robber_hex)
+        self.version += 1
+
+    def setup_board_layout(self, resources, tokens):
+        """Plansza podana hex po hexie: resources[i] to zasób hexa i, tokens[i] jego numerek (pustynia 0 albo None)"""
+        # setup_board zdejmuje z końca list, a pustynia nie bierze numerka
+        self.setup_board(list(reversed(resources)), [token for token in reversed(tokens) if token])
+
     def start_initial_placement(self):
         self.initial_placement_order = (
                 [i for i in range(len(self.players))] +  # 0,1,2,3
                 [i for i in reversed(range(len(self.players)))]  # 3,2,1,0
         )
         self.current_player_idx = self.initial_placement_order.pop(0)
+        self._diff_phase()
+        self.version += 1
 
     def next_initial_placement(self):
+        self.version += 1
         if self.placement_stage == 0:
             # Just placed a settlement, now place a road
             self.placement_stage = 1
@@ -55,179 +144,380 @@ class GameState:
                 # Move to next player's settlement
                 self.placement_stage = 0
                 self.current_player_idx = self.initial_placement_order.pop(0)
+        self._diff_phase()
 
     def get_current_player(self):
         return self.players[self.current_player_idx]
 
+    def get_winner(self):
+        """Gracz, który ma już punkty do wygranej (albo None)"""
+        for player in self.players:
+            if player['victory_points'] >= VICTORY_POINTS_TO_WIN:
+                return player['id']
+        return None
+
     def next_turn(self):
+        self.version += 1
         if not self.initial_placement_phase:
             dice_roll = self.roll_dice()
-            print(f"Gracz {self.current_player_idx + 1} wyrzucił: {dice_roll}")
+            self._emit(EventType.DICE_ROLLED, player=self.current_player_idx, roll=dice_roll)
             if dice_roll == 7: # Jak się wyrzuciło 7 to jeszcze nie idź do następnego gracza
                 self.handle_robber()
                 return
             else:
                 self.distribute_resources(dice_roll)
 
+        self._emit(EventType.TURN_ENDED, player=self.current_player_idx)
         self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
+        self._diff_phase()
 
     def build_settlement(self, node_id, player_id, initial_placement=False):
-        if node_id not in self.graph.nodes:
+        board = self.board
+        if not board.has_vertex(node_id) or self.players[player_id]['settlements_left'] == 0:
             return False
 
         if not initial_placement and not self.can_afford_settlement(player_id):
-            print("Nie stać cię na wioskę biedaku")
+            self._emit(EventType.CANNOT_AFFORD, player=player_id, item=ActionType.SETTLEMENT)
             return False
 
-        # Inne zasady dla fazy początkowej
-        if initial_placement:
-            if self.graph.nodes[node_id]['owner'] is not None:
-                return False
-            for neighbor in self.graph.neighbors(node_id):
-                if self.graph.nodes[neighbor]['owner'] is not None:
-                    return False
-        else:
-            # Normal rules - check distance and adjacent settlements
-            if self.graph.nodes[node_id]['owner'] is not None:
-                return False
-            for neighbor in self.graph.neighbors(node_id):
-                if self.graph.nodes[neighbor]['owner'] is not None:
-                    return False
+        # Zasada odległości - taka sama w fazie początkowej i normalnej
+        if node_id not in self.free_vertices:
+            return False
 
-        self.graph.nodes[node_id].update({
-            'owner': player_id,
-            'building': BuildingType.SETTLEMENT
-        })
-        self.players[player_id]['victory_points'] += 1
+        self.put_settlement(node_id, player_id)
+        self._emit(EventType.SETTLEMENT_BUILT, player=player_id, vertex=node_id, initial=initial_placement)
 
         # W fazie początkowej dostaje się zasoby tam gdzie postawisz osadę
+        hand = self.players[player_id]['resources']
         if initial_placement:
-            for hex_data in self.hexes:
-                if node_id in hex_data['vertices'] and hex_data['resource'] != 'pustynia':
-                    resource = hex_data['resource']
-                    if resource != 'pustynia':  # Double-check to exclude desert
-                        self.players[player_id]['resources'][resource] += 1
-
-        if not initial_placement:
-            self.players[player_id]['resources']['drewno'] -= 1
-            self.players[player_id]['resources']['glina'] -= 1
-            self.players[player_id]['resources']['owca'] -= 1
-            self.players[player_id]['resources']['zboze'] -= 1
-            # Wywala się puste zasoby
-            for res in ['drewno', 'glina', 'owca', 'zboze']:
-                if self.players[player_id]['resources'].get(res, 0) == 0:
-                    del self.players[player_id]['resources'][res]
-
+            grants = self.analysis.vertex_grants[node_id]
+            for resource in grants:
+                hand[resource] += 1
+                self._emit(EventType.PRODUCTION, player=player_id, resource=resource, amount=1)
+            if self.diffs is not None:
+                self._diff_resources(player_id, [grants.count(resource) for resource in Resource])
+        else:
+            pay(hand, SETTLEMENT_COST)
+            self._diff_resources(player_id, [-amount for amount in SETTLEMENT_COST])
         return True
 
+    def put_settlement(self, node_id, player_id):
+        """Stawia wioskę bez sprawdzania zasad i płacenia (plansza, indeksy, pionki, punkty)
+
+        Z build_settlement i przy nakładaniu różnic na kopię gry (game/diff.py).
+        """
+        board = self.board
+        board.vertex_owner[node_id] = player_id
+        board.vertex_building[node_id] = BuildingType.SETTLEMENT
+        self.road_networks[player_id].add(node_id)
+        self.settlements[player_id].add(node_id)
+        self._update_candidates_after_settlement(node_id, player_id)
+        self.production.set_building(node_id, player_id, 1)
+        self.analysis.set_building(node_id, player_id, 1)
+        self.players[player_id]['settlements_left'] -= 1
+        self.players[player_id]['victory_points'] += 1
+        if self.diffs is not None:
+            self.diffs.append((DiffType.VERTEX, node_id, player_id, BuildingType.SETTLEMENT.value))
+
+        # Wioska może przeciąć czyjąś drogę
+        if self.longest_roads.cut_at_vertex(node_id, player_id):
+            self.update_longest_road_card()
+        self.version += 1
+
     def build_road(self, u, v, player_id):
-        if not self.graph.has_edge(u, v):
+        board = self.board
+        edge = board.edge_id(u, v)
+        if edge is None or self.players[player_id]['roads_left'] == 0:
             return False
 
         # Check if player can afford the road first (unless in initial placement)
         if not self.initial_placement_phase and not self.can_afford_road(player_id):
-            print("Nie stać cię na drogę biedaku")
+            self._emit(EventType.CANNOT_AFFORD, player=player_id, item=ActionType.ROAD)
             return False
 
         # Sprawdzenie, czy droga należy do kogoś
-        if self.graph.edges[u, v]['owner'] is not None:
+        if board.edge_owner[edge] is not None:
             return False
 
-        # Sprawdzenie, czy jest wioska/miasto przynależne, bo wtedy możemy budować
-        if self.graph.nodes[u]['owner'] == player_id or self.graph.nodes[v]['owner'] == player_id:
-            # Deduct resources first (unless in initial placement)
-            if not self.initial_placement_phase:
-                self.players[player_id]['resources']['drewno'] -= 1
-                self.players[player_id]['resources']['glina'] -= 1
-                # Remove resource keys if count reaches 0
-                if self.players[player_id]['resources']['drewno'] == 0:
-                    del self.players[player_id]['resources']['drewno']
-                if self.players[player_id]['resources']['glina'] == 0:
-                    del self.players[player_id]['resources']['glina']
-
-            self.graph.edges[u, v]['owner'] = player_id
-            self.update_longest_road_card()
-            return True
+        # Można budować przy swojej wiosce/mieście albo przy końcu swojej drogi,
+        # ale nie przez cudzą wioskę/miasto
+        if not (self._extends_network(u, player_id) or self._extends_network(v, player_id)):
+            return False
 
-        # Sprawdzenie czy jest połączenie drogowe, nie wiem zrobił to, jakimś DFS
-        # We need to find if there's a path from this edge to any of player's roads
-        # through other player's roads
-        temp_graph = self.graph.copy()
+        # Deduct resources first (unless in initial placement)
+        if not self.initial_placement_phase:
+            pay(self.players[player_id]['resources'], ROAD_COST)
+            self._diff_resources(player_id, [-amount for amount in ROAD_COST])
 
-        # Temporarily add this road to check connectivity
-        temp_graph.edges[u, v]['owner'] = player_id
+        self.put_road(edge, player_id)
+        self._emit(EventType.ROAD_BUILT, player=player_id, edge=edge)
+        return True
 
-        # Get all player's roads
-        player_roads = [(x, y) for x, y, data in temp_graph.edges(data=True)
-                        if data['owner'] == player_id]
+    def put_road(self, edge, player_id):
+        """Kładzie drogę bez sprawdzania zasad i płacenia, razem z przeliczeniem najdłuższej drogi"""
+        self.board.edge_owner[edge] = player_id
+        self.players[player_id]['roads_left'] -= 1
+        self.road_networks[player_id].update(self.board.topology.edge_vertices[edge])
+        self._update_candidates_after_road(edge, player_id)
+        if self.diffs is not None:
+            self.diffs.append((DiffType.EDGE, edge, player_id))
+        self.longest_roads.add_road(edge, player_id)
+        self.update_longest_road_card()
+        self.version += 1
+
+    def _extends_network(self, vertex, player_id):
+        if vertex not in self.road_networks[player_id]:
+            return False
+        owner = self.board.vertex_owner[vertex]
+        return owner is None or owner == player_id
 
-        # Check if this new road connects to any existing road
-        for road in player_roads:
-            if road == (u, v):  # Skip the current road we're adding
-                continue
+    def _update_candidates_after_settlement(self, node_id, player_id):
+        topology = self.board.topology
+        self.free_vertices.discard(node_id)
+        self.free_vertices.difference_update(topology.vertex_neighbors[node_id])
 
-            # Check if connected through roads (BFS)
-            visited = set()
-            queue = []
-            start_node = u if u in road else (v if v in road else None)
-
-            if start_node is not None:
-                queue.append(start_node)
-                visited.add(start_node)
-
-                while queue:
-                    current = queue.pop(0)
-
-                    for neighbor in temp_graph.neighbors(current):
-                        if neighbor not in visited:
-                            edge_data = temp_graph.edges[current, neighbor]
-                            # Only traverse through player's roads
-                            if edge_data['owner'] == player_id:
-                                if neighbor in road:
-                                    # Deduct resources first (unless in initial placement)
-                                    if not self.initial_placement_phase:
-                                        self.players[player_id]['resources']['drewno'] -= 1
-                                        self.players[player_id]['resources']['glina'] -= 1
-                                        # Remove resource keys if count reaches 0
-                                        if self.players[player_id]['resources']['drewno'] == 0:
-                                            del self.players[player_id]['resources']['drewno']
-                                        if self.players[player_id]['resources']['glina'] == 0:
-                                            del self.players[player_id]['resources']['glina']
-
-                                    self.graph.edges[u, v]['owner'] = player_id
-                                    self.update_longest_road_card()
-                                    return True
-                                visited.add(neighbor)
-                                queue.append(neighbor)
-        return False
+        edge_owner = self.board.edge_owner
+        for edge in topology.vertex_edges[node_id]:
+            if edge_owner[edge] is not None:
+                continue
+            self.road_candidates[player_id].add(edge)
+            # Inni gracze mogą już nie mieć jak dojść do tej krawędzi przez nową wioskę
+            u, v = topology.edge_vertices[edge]
+            for other_id, candidates in enumerate(self.road_candidates):
+                if (other_id != player_id and edge in candidates and
+                        not self._extends_network(u, other_id) and not self._extends_network(v, other_id)):
+                    candidates.discard(edge)
+
+    def _update_candidates_after_road(self, edge, player_id):
+        topology = self.board.topology
+        for candidates in self.road_candidates:
+            candidates.discard(edge)
+        candidates = self.road_candidates[player_id]
+        for vertex in topology.edge_vertices[edge]:
+            if self._extends_network(vertex, player_id):
+                for other in topology.vertex_edges[vertex]:
+                    if self.board.edge_owner[other] is None:
+                        candidates.add(other)
+
+    def rebuild_indexes(self):
+        """Przelicza od zera z planszy sieci dróg, kandydatów, indeks produkcji i najdłuższe drogi
+
+        Do stanu wczytanego bez tych pomocniczych struktur (np. z game/encoding.py).
+        """
+        board = self.board
+        topology = board.topology
+        num_players = len(self.players)
+        self.road_networks = [set() for _ in range(num_players)]
+        self.road_candidates = [set() for _ in range(num_players)]
+        self.settlements = [set() for _ in range(num_players)]
+        self.free_vertices = set(range(topology.num_vertices))
+        self.production = ProductionIndex(self.hexes, topology, self.robber_hex)
+        self.analysis = BoardAnalysis(self.hexes, topology, self.robber_hex)
+
+        for edge, owner in enumerate(board.edge_owner):
+            if owner is not None:
+                self.road_networks[owner].update(topology.edge_vertices[edge])
+        for vertex, owner in enumerate(board.vertex_owner):
+            if owner is None:
+                continue
+            building = board.vertex_building[vertex]
+            self.road_networks[owner].add(vertex)
+            if building == BuildingType.SETTLEMENT:
+                self.settlements[owner].add(vertex)
+            self.free_vertices.discard(vertex)
+            self.free_vertices.difference_update(topology.vertex_neighbors[vertex])
+            amount = 1 if building == BuildingType.SETTLEMENT else 2
+            self.production.set_building(vertex, owner, amount)
+            self.analysis.set_building(vertex, owner, amount)
+
+        for edge, (u, v) in enumerate(topology.edge_vertices):
+            if board.edge_owner[edge] is None:
+                for player_id in range(num_players):
+                    if self._extends_network(u, player_id) or self._extends_network(v, player_id):
+                        self.road_candidates[player_id].add(edge)
+
+        self.longest_roads.rebuild()
+        self.version += 1
 
     def upgrade_to_city(self, node_id, player_id):
-        if (node_id not in self.graph.nodes or
-                self.graph.nodes[node_id]['owner'] != player_id or
-                self.graph.nodes[node_id]['building'] != BuildingType.SETTLEMENT):
+        board = self.board
+        if (not board.has_vertex(node_id) or
+                board.vertex_owner[node_id] != player_id or
+                board.vertex_building[node_id] != BuildingType.SETTLEMENT or
+                self.players[player_id]['cities_left'] == 0):
             return False
 
         if not self.can_afford_city(player_id):
-            print("Nie stać cię na miasto biedaku!")
+            self._emit(EventType.CANNOT_AFFORD, player=player_id, item=ActionType.CITY)
             return False
 
-        self.graph.nodes[node_id]['building'] = BuildingType.CITY
+        self.put_city(node_id, player_id)
+        pay(self.players[player_id]['resources'], CITY_COST)
+        self._diff_resources(player_id, [-amount for amount in CITY_COST])
+        self._emit(EventType.CITY_BUILT, player=player_id, vertex=node_id)
+        return True
+
+    def put_city(self, node_id, player_id):
+        """Ulepsza wioskę do miasta bez sprawdzania zasad i płacenia"""
+        self.board.vertex_building[node_id] = BuildingType.CITY
+        self.settlements[player_id].discard(node_id)
+        self.production.set_building(node_id, player_id, 2)
+        self.analysis.set_building(node_id, player_id, 2)
+        self.players[player_id]['settlements_left'] += 1  # Wioska wraca do gracza
+        self.players[player_id]['cities_left'] -= 1
         self.players[player_id]['victory_points'] += 1  # Dodajemy jeden punkt za ulepsczenie wioska -> miasto
+        if self.diffs is not None:
+            self.diffs.append((DiffType.VERTEX, node_id, player_id, BuildingType.CITY.value))
+        self.version += 1
 
-        # Deduct resources
-        self.players[player_id]['resources']['zboze'] -= 2
-        self.players[player_id]['resources']['kamień'] -= 3
-        # Clean up empty resources
-        for res in ['zboze', 'kamień']:
-            if self.players[player_id]['resources'].get(res, 0) == 0:
-                del self.players[player_id]['resources'][res]
-        return True
+    def legal_actions(self):
+        """Wszystkie legalne ruchy aktualnego gracza, jako krotki (ActionType, argumenty...)
 
-    def roll_dice(self):
-        dice_1 = random.randint(1, 6)
-        dice_2 = random.randint(1, 6)
+        Liczone ze zbiorów kandydatów trzymanych na bieżąco, bez próbowania build_*.
+        """
+        player_id = self.current_player_idx
+        player = self.players[player_id]
 
-        self.diceroll = dice_1 + dice_2
+        if self.initial_placement_phase:
+            if self.placement_stage == 0:
+                if player['settlements_left'] == 0:
+                    return []
+                return [(ActionType.SETTLEMENT, vertex) for vertex in self.free_vertices]
+            if player['roads_left'] == 0:
+                return []
+            return [(ActionType.ROAD, edge) for edge in self.road_candidates[player_id]]
+
+        if self.robber_phase:
+            return [(ActionType.ROBBER, hex_id) for hex_id in robber_targets(self)]
+
+        actions = []
+        if player['settlements_left'] and self.can_afford_settlement(player_id):
+            actions.extend((ActionType.SETTLEMENT, vertex) for vertex in self.free_vertices)
+        if player['roads_left'] and self.can_afford_road(player_id):
+            actions.extend((ActionType.ROAD, edge) for edge in self.road_candidates[player_id])
+        if player['cities_left'] and self.can_afford_city(player_id):
+            actions.extend((ActionType.CITY, vertex) for vertex in self.settlements[player_id])
+
+        resources = player['resources']
+        for give_resource in Resource:
+            if resources[give_resource] >= BANK_TRADE_RATE:
+                actions.extend((ActionType.TRADE, give_resource, take_resource)
+                               for take_resource in Resource if take_resource != give_resource)
+
+        actions.append((ActionType.END_TURN,))
+        return actions
+
+    def apply_action(self, action):
+        """Wykonuje ruch z legal_actions() za aktualnego gracza, tak jak robi to main.py"""
+        action_type = action[0]
+        player_id = self.current_player_idx
+
+        # W fazie początkowej tylko wioska albo droga (zależnie od etapu), przy złodzieju tylko złodziej
+        if self.initial_placement_phase:
+            if action_type != (ActionType.SETTLEMENT, ActionType.ROAD)[self.placement_stage]:
+                return False
+        elif self.robber_phase and action_type != ActionType.ROBBER:
+            return False
+        # Wierzchołek, krawędź albo hex musi być z planszy (ujemny numer nie może zawinąć listy)
+        if not self._argument_in_range(action):
+            return False
+
+        if action_type == ActionType.SETTLEMENT:
+            done = self.build_settlement(action[1], player_id, initial_placement=self.initial_placement_phase)
+        elif action_type == ActionType.ROAD:
+            u, v = self.board.topology.edge_vertices[action[1]]
+            done = self.build_road(u, v, player_id)
+        elif action_type == ActionType.CITY:
+            return self.upgrade_to_city(action[1], player_id)
+        elif action_type == ActionType.TRADE:
+            return self.trade_with_bank(player_id, action[1], action[2])
+        elif action_type == ActionType.ROBBER:
+            return self.place_robber(action[1])
+        elif action_type == ActionType.END_TURN:
+            self.next_turn()
+            return True
+        else:
+            return False
+
+        # W fazie początkowej po wiosce i drodze przechodzimy dalej
+        if done and self.initial_placement_phase:
+            self.next_initial_placement()
+        return done
+
+    def _argument_in_range(self, action):
+        """Czy wierzchołek / krawędź / hex z ruchu jest na planszy (wymiana i koniec tury zawsze tak)"""
+        action_type = action[0]
+        topology = self.board.topology
+        if action_type in (ActionType.SETTLEMENT, ActionType.CITY):
+            size = topology.num_vertices
+        elif action_type == ActionType.ROAD:
+            size = topology.num_edges
+        elif action_type == ActionType.ROBBER:
+            size = len(self.hexes)
+        else:
+            return True
+        return isinstance(action[1], int) and 0 <= action[1] < size
+
+    def snapshot(self):
+        """Niezmienny zapis stanu gry (plansza, gracze, złodziej, fazy, indeksy i stan losowania)
+
+        Do przeszukiwania drzewa gry: restore() wraca do tego stanu bez deepcopy. Zapis pasuje
+        tylko do tej samej gry (te same hexy i ta sama liczba graczy).
+        """
+        return (
+            self.board.snapshot(),
+            tuple((tuple(player['resources']), player['victory_points'], player['longest_road'],
+                   player['roads_left'], player['settlements_left'], player['cities_left'])
+                  for player in self.players),
+            (self.current_player_idx, self.initial_placement_phase, tuple(self.initial_placement_order),
+             self.placement_stage, self.initial_placement_complete, self.diceroll, self.robber_phase,
+             self.robber_hex, self.trading_mode, self.trade_stage, self.selected_trade_resource),
+            self.production.snapshot() if self.production else None,
+            self.analysis.snapshot() if self.analysis else None,
+            self.longest_roads.snapshot(),
+            tuple(frozenset(network) for network in self.road_networks),
+            frozenset(self.free_vertices),
+            tuple(frozenset(candidates) for candidates in self.road_candidates),
+            tuple(frozenset(settlements) for settlements in self.settlements),
+            self.rng.getstate(),
+            self.dice.snapshot()
+        )
+
+    def restore(self, state):
+        """Przywraca stan zapisany przez snapshot()"""
+        (board, players, flags, production, analysis, longest_roads, road_networks, free_vertices,
+         road_candidates, settlements, rng_state, dice) = state
+
+        self.board.restore(board)
+        for player, (resources, victory_points, longest_road, roads_left, settlements_left,
+                     cities_left) in zip(self.players, players):
+            player['resources'] = list(resources)
+            player['victory_points'] = victory_points
+            player['longest_road'] = longest_road
+            player['roads_left'] = roads_left
+            player['settlements_left'] = settlements_left
+            player['cities_left'] = cities_left
+        (self.current_player_idx, self.initial_placement_phase, initial_placement_order,
+         self.placement_stage, self.initial_placement_complete, self.diceroll, self.robber_phase,
+         self.robber_hex, self.trading_mode, self.trade_stage, self.selected_trade_resource) = flags
+        self.initial_placement_order = list(initial_placement_order)
+        if production is not None:
+            self.production.restore(production)
+        if analysis is not None:
+            self.analysis.restore(analysis)
+        self.longest_roads.restore(longest_roads)
+        self.road_networks = [set(network) for network in road_networks]
+        self.free_vertices = set(free_vertices)
+        self.road_candidates = [set(candidates) for candidates in road_candidates]
+        self.settlements = [set(player_settlements) for player_settlements in settlements]
+        self.rng.setstate(rng_state)
+        self.dice.restore(dice)
+        self.version += 1
+
+    def roll_dice(self):
+        self.diceroll = self.dice.roll()
+        if self.diffs is not None:
+            self.diffs.append((DiffType.DICE, self.diceroll))
         return self.diceroll
 
     def distribute_resources(self, dice_roll):
@@ -235,176 +525,115 @@ class GameState:
             self.handle_robber()
             return
 
-        for hex_data in self.hexes:
-            if hex_data['resource'] == 'pustynia' or hex_data['token'] is None:
-                continue
-
-            # Sprawdzenie numerków pól, czy są takie same jak na kości
-            if hex_data['token'] == dice_roll:
-
-                # Blokujemy hexa złodziejem
-                if self.robber_hex and self.robber_hex['position'] == hex_data['position']:
-                    continue
-
-                # Sprawdzenie wszystkich miast należacych to tego jebanego plastra miodu
-                for vertex in hex_data['vertices']:
-                    if vertex in self.graph.nodes:
-                        node_data = self.graph.nodes[vertex]
-                        if node_data['owner'] is not None:
-                            player_id = node_data['owner']
-                            # Dodajemy zasoby, miasto daje +2 a wioska +1
-                            if node_data['building'] == BuildingType.SETTLEMENT:
-                                self.players[player_id]['resources'][hex_data['resource']] += 1
-                            elif node_data['building'] == BuildingType.CITY:
-                                self.players[player_id]['resources'][hex_data['resource']] += 2
+        # Z indeksu produkcji od razu wiadomo kto co dostaje (wioska +1, miasto +2, złodziej już odjęty)
+        players = self.players
+        emit = bool(self.listeners)
+        deltas = None if self.diffs is None else [[0] * len(Resource) for _ in players]
+        for player_id, resource, amount in self.production.payouts(dice_roll):
+            players[player_id]['resources'][resource] += amount
+            if emit:
+                self._emit(EventType.PRODUCTION, player=player_id, resource=resource, amount=amount)
+            if deltas is not None:
+                deltas[player_id][resource] += amount
+        if deltas is not None:
+            for player_id, delta in enumerate(deltas):
+                self._diff_resources(player_id, delta)
 
     def handle_robber(self):
         """Kieddy jest wyrzucone 7 to jak się ma więcej niż 7 zasobów to traci się mniejszą połowę, na razie losowo"""
-        print("Wyrzucił się złodziej, trzeba to zrobić")
+        self._emit(EventType.ROBBER_ACTIVATED, player=self.current_player_idx)
         for player in self.players:
-            total_resources = sum(player['resources'].values())
+            hand = player['resources']
+            total_resources = sum(hand)
             if total_resources > 7:
                 discard_count = total_resources // 2
-                print(f"Player {player['id'] + 1} must discard {discard_count} resources")
-
-                resources = []
-                for resource, count in player['resources'].items():
-                    resources.extend([resource] * count)
-
-                random.shuffle(resources)
-                for resource in resources[:discard_count]:
-                    player['resources'][resource] -= 1
-                    if player['resources'][resource] == 0:
-                        del player['resources'][resource]
+                self._emit(EventType.DISCARD_REQUIRED, player=player['id'], count=discard_count)
+
+                # Losujemy od razu z ilości kart, bez rozwijania ręki w listę
+                discarded = draw_from_counts(self.rng, hand, discard_count)
+                pay(hand, discarded)
+                self._diff_resources(player['id'], [-count for count in discarded])
+                if self.listeners:
+                    for resource, count in zip(Resource, discarded):
+                        if count:
+                            self._emit(EventType.DISCARD, player=player['id'], resource=resource, count=count)
         # Tutaj wchodzimy do fazy gdzie stawiamy złodzieja
         self.robber_phase = True
-        print("Wybierz pole gdzie chcesz postawić złodzieja")
+        self._diff_phase()
 
-    def place_robber(self, hex_pos):
+    def place_robber(self, hex_id):
         """ Tam gdzie stawiamy złodzieja to wybieramy losowy surowiec od losowego gracza"""
         if not self.robber_phase:
             return False
 
-        # Znajdz pozycje tego hexa
-        target_hex = None
-        for hex_data in self.hexes:
-            if hex_data['position'] == hex_pos:
-                target_hex = hex_data
-                break
-
-        if not target_hex or target_hex == self.robber_hex:
+        if not isinstance(hex_id, int) or not 0 <= hex_id < len(self.hexes) or hex_id == self.robber_hex:
+            return False
+        if self.hexes[hex_id]['resource'] == 'pustynia':  # Na pustynię nie można (jak robber_targets)
             return False
 
-        # Zmieniamy pozycję starego złodzieja
-        self.robber_hex = target_hex
+        self.move_robber(hex_id)
         self.robber_phase = False
+        self._emit(EventType.ROBBER_MOVED, player=self.current_player_idx, hex=hex_id)
 
-        # Szukamy graczy którzy mają wioskę/miasto przy tym polu
-        adjacent_players = set()
-        for vertex in target_hex['vertices']:
-            if vertex in self.graph.nodes:
-                node_data = self.graph.nodes[vertex]
-                if (node_data['owner'] is not None and
-                        node_data['owner'] != self.current_player_idx and
-                        node_data['building'] != BuildingType.NONE):
-                    adjacent_players.add(node_data['owner'])
-
-        # Tutaj kradniemy zasoby
-        if adjacent_players:
-            victim_id = random.choice(list(adjacent_players))
+        # Szukamy graczy którzy mają wioskę/miasto przy tym polu i kradniemy od jednego z nich
+        victims = robber_victims(self, hex_id)
+        if victims:
+            victim_id = self.rng.choice(victims)
             self.steal_resource(victim_id)
 
         # Dopiero po postawieniu i ukradnięciu idziemy do następnego gracza
         self.robber_phase = False
+        self._emit(EventType.TURN_ENDED, player=self.current_player_idx)
         self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
+        self._diff_phase()
+        self.version += 1
         return True
 
+    def move_robber(self, hex_id):
+        """Przestawia złodzieja (i indeksy produkcji) bez zasad i kradzieży"""
+        self.robber_hex = hex_id
+        self.production.move_robber(hex_id)
+        self.analysis.move_robber(hex_id)
+        if self.diffs is not None:
+            self.diffs.append((DiffType.ROBBER, hex_id))
+        self.version += 1
+
     def steal_resource(self, victim_id):
         """Tutaj jest ta kradzież tych surowców"""
         victim = self.players[victim_id]
         thief = self.players[self.current_player_idx]
 
-        resources = []
-        for resource, count in victim['resources'].items():
-            resources.extend([resource] * count)
-
-        if resources:
-            stolen_resource = random.choice(resources)
+        stolen = draw_from_counts(self.rng, victim['resources'], 1)
+        if any(stolen):
+            stolen_resource = Resource(stolen.index(1))
             victim['resources'][stolen_resource] -= 1
             thief['resources'][stolen_resource] += 1
-
-            if victim['resources'][stolen_resource] == 0:
-                del victim['resources'][stolen_resource]
-
-            print(f"Gracz {thief['id'] + 1} ukradł 1 {stolen_resource} od Gracza {victim['id'] + 1}")
+            if self.diffs is not None:
+                self._diff_resources(victim_id, [-count for count in stolen])
+                self._diff_resources(thief['id'], stolen)
+            self._emit(EventType.STEAL, player=thief['id'], victim=victim_id, resource=stolen_resource)
 
     def can_afford_road(self, player_id):
         """Sprawdzamy, czy stać na drogę, u mnie jedno drewno i jedna glina """
-        player = self.players[player_id]
-        return (player['resources'].get('drewno', 0) >= 1 and
-                player['resources'].get('glina', 0) >= 1)
+        return can_afford(self.players[player_id]['resources'], ROAD_COST)
 
     def can_afford_settlement(self, player_id):
         """Sprawdzamy, czy stać na wioskę, u mnie po jednym ze wszystkiego oprócz kamienia"""
-        player = self.players[player_id]
-        return (player['resources'].get('drewno', 0) >= 1 and
-                player['resources'].get('glina', 0) >= 1 and
-                player['resources'].get('owca', 0) >= 1 and
-                player['resources'].get('zboze', 0) >= 1)
+        return can_afford(self.players[player_id]['resources'], SETTLEMENT_COST)
 
     def can_afford_city(self, player_id):
         """Sprawdzamy, czy stać na ulepszenie wioski na miasto"""
-        player = self.players[player_id]
-        return (player['resources'].get('zboze', 0) >= 2 and
-                player['resources'].get('kamień', 0) >= 3)
+        return can_afford(self.players[player_id]['resources'], CITY_COST)
 
     def calculate_longest_roads(self):
-        """Liczenie najdłuższej drogi dla każdego gracza"""
+        """Najdłuższa droga każdego gracza (z cache'a, przeliczane tylko to co się zmieniło)"""
         player_longest_roads = defaultdict(int)
-
         for player_id in range(len(self.players)):
-            # Wszystkie drogi należące do tego gracza
-            player_roads = [(u, v) for u, v, data in self.graph.edges(data=True)
-                            if data['owner'] == player_id]
-
-            if not player_roads:
-                continue
-
-            # Tworzenie supgrafu dla tylko tego gracza
-            road_graph = nx.Graph()
-            road_graph.add_edges_from(player_roads)
-
-            # Znalezienie najdłuższej drogi w tym supgrafie
-            longest = 0
-            # Trzeba sprawdzić każdy punkt początkowy
-            for component in nx.connected_components(road_graph):
-                subgraph = road_graph.subgraph(component)
-                # Dla każdego połączonej drogi sprawdź
-                for node in subgraph.nodes():
-                    path_length = self._longest_path_from_node(subgraph, node)
-                    if path_length > longest:
-                        longest = path_length
-
-            player_longest_roads[player_id] = longest
-
+            length = self.longest_roads.length(player_id)
+            if length:
+                player_longest_roads[player_id] = length
         return player_longest_roads
 
-    def _longest_path_from_node(self, graph, start_node, visited=None):
-        """Funkcja pomocnicza, która szuka najdłuższej drogi za pomocą DFS"""
-        if visited is None:
-            visited = set()
-
-        max_length = 0
-        visited.add(start_node)
-
-        for neighbor in graph.neighbors(start_node):
-            if neighbor not in visited:
-                length = 1 + self._longest_path_from_node(graph, neighbor, visited.copy())
-                if length > max_length:
-                    max_length = length
-
-        return max_length
-
     def update_longest_road_card(self):
         longest_roads = self.calculate_longest_roads()
         current_max = 0
@@ -420,41 +649,65 @@ class GameState:
                 pass
 
         # Update tego gracza
+        previous_holder = None
         for player in self.players:
             if 'longest_road' in player and player['longest_road']:
+                previous_holder = player['id']
                 player['longest_road'] = False
                 player['victory_points'] -= 2  # Trzeba zabrać te punkty, jak się straciło
 
         if current_holder is not None:
             self.players[current_holder]['longest_road'] = True
             self.players[current_holder]['victory_points'] += 2  # Dodaj nowe punkty
-            print(f'Gracz {current_holder + 1}: ma najdłuższą drogę : {current_max}')
+        if current_holder != previous_holder:
+            self._emit(EventType.LONGEST_ROAD, player=current_holder, previous=previous_holder, length=current_max)
 
     def trade_with_bank(self, player_id, give_resource, take_resource):
-        """Wymieniamy 4 czegoś na 1 czegoś"""
-        player = self.players[player_id]
+        """Wymieniamy 4 czegoś na 1 czegoś (zasoby jako Resource)"""
+        hand = self.players[player_id]['resources']
+        if give_resource == take_resource:
+            return False
 
         # Trzeba sprawdzić czy gracz ma co najmniej 4 zasoby
-        if player['resources'].get(give_resource, 0) < 4:
-            print(f"Nie masz wystarczająco {give_resource} (potrzeba 4)")
+        if hand[give_resource] < BANK_TRADE_RATE:
+            self._emit(EventType.CANNOT_AFFORD, player=player_id, item=ActionType.TRADE,
+                       resource=give_resource, need=BANK_TRADE_RATE)
             return False
 
         # Robimy ten trade
-        player['resources'][give_resource] -= 4
-        if player['resources'][give_resource] == 0:
-            del player['resources'][give_resource]
-
-        player['resources'][take_resource] = player['resources'].get(take_resource, 0) + 1
-
-        print(f"Gracz {player_id + 1} wymienił 4 {give_resource} na 1 {take_resource}")
+        hand[give_resource] -= BANK_TRADE_RATE
+        hand[take_resource] += 1
+        if self.diffs is not None:
+            delta = [0] * len(Resource)
+            delta[give_resource] -= BANK_TRADE_RATE
+            delta[take_resource] += 1
+            self._diff_resources(player_id, delta)
+
+        self._emit(EventType.TRADE, player=player_id, give=give_resource, take=take_resource)
+        self.version += 1
         return True
 
 
     def to_qubo_input(self):
-        """Na razie takie coś, zobaczymy czy się nada, ale raczej do zmiany"""
-        return {
-            'graph': nx.node_link_data(self.graph),
-            'players': self.players,
-            'current_player': self.current_player_idx,
-            'hexes': self.hexes
-        }
+        """Cechy stanu dla agentów jako tablice NumPy o stałych wymiarach (opis w game/features.py)"""
+        return state_features(self)
+
+
+def create_game(num_players=PLAYERS_NUMBERS, rng=None, fair=False):
+    """Nowa gra z graczami i potasowaną planszą, bez pygame (to samo ziarno = ta sama gra)
+
+    fair=True losuje planszę z game/board_generator.py (bez sąsiednich 6/8, równe pipsy)
+    """
+    game = GameState(rng)
+    for _ in range(num_players):
+        game.add_player()
+
+    if fair:
+        game.setup_board_layout(*fair_layout(game.rng))
+    else:
+        resource_list = RESOURCES.copy()
+        token_list = TOKENS.copy()
+        game.rng.shuffle(resource_list)
+        game.rng.shuffle(token_list)
+        game.setup_board(resource_list, token_list)
+    return game
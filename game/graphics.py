@@ -1,8 +1,56 @@
 import pygame
 import math
-from .constants import RESOURCE_COLORS, HEX_SIZE, VERTEX_RADIUS, PLAYER_COLORS, ROAD_WIDTH, WIDTH, HEIGHT
+from collections import OrderedDict
+from .constants import (RESOURCE_COLORS, HEX_SIZE, VERTEX_RADIUS, PLAYER_COLORS, ROAD_WIDTH, WIDTH, HEIGHT,
+                        RESOURCE_TYPES, EVENT_LOG_LINES)
 from .enums import BuildingType
 
+EMPTY_ROAD_COLOR = (150, 150, 150)
+ROBBER_RADIUS = 15
+LOG_X = WIDTH - 480  # Log zdarzeń w prawym dolnym rogu
+TEXT_CACHE_SIZE = 256
+
+
+class TextCache:
+    """Cache wyrenderowanych napisów (LRU) po kluczu (tekst, kolor, czcionka)"""
+
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (text, color, font)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+text_cache = TextCache()
+_overlay = None
+
+def get_overlay(size):
+    """Półprzezroczyste przyciemnienie pod okno wymiany, tworzone tylko raz"""
+    global _overlay
+    if _overlay is None or _overlay.get_size() != size:
+        _overlay = pygame.Surface(size, pygame.SRCALPHA)
+        _overlay.fill((0, 0, 0, 128))
+    return _overlay
+
 def draw_hex(surface, color, pos, size, text=None, font=None):
     x, y = pos
     points = []
@@ -14,40 +62,59 @@ def draw_hex(surface, color, pos, size, text=None, font=None):
     pygame.draw.polygon(surface, color, points)
     pygame.draw.polygon(surface, (0, 0, 0), points, 2)
     if text and font:
-        label = font.render(text, True, (0, 0, 0))
+        label = text_cache.render(font, text, (0, 0, 0))
         surface.blit(label, (x - label.get_width() // 2, y - label.get_height() // 2))
     return points
 
-def render_game(screen, font, game):
-    screen.fill((255, 255, 255))
-
+def draw_static_board(surface, font, game, view):
+    """To co się nie zmienia w trakcie gry: tło, hexy z numerkami i puste drogi"""
+    surface.fill((255, 255, 255))
     for hex_data in game.hexes:
         color = RESOURCE_COLORS[hex_data['resource']]
-        draw_hex(screen, color, hex_data['position'], HEX_SIZE,
+        draw_hex(surface, color, view.hex_positions[hex_data['id']], HEX_SIZE,
                  text=str(hex_data['token']) if hex_data['token'] else None,
                  font=font)
+    for u, v in view.edge_segments:
+        pygame.draw.line(surface, EMPTY_ROAD_COLOR, u, v, ROAD_WIDTH)
+
+def draw_road(surface, view, edge, owner):
+    color = EMPTY_ROAD_COLOR if owner is None else PLAYER_COLORS[owner % len(PLAYER_COLORS)]
+    u, v = view.edge_segments[edge]
+    return pygame.draw.line(surface, color, u, v, ROAD_WIDTH)
 
-    for u, v, data in game.graph.edges(data=True):
-        color = (150, 150, 150)
-        if data['owner'] is not None:
-            color = PLAYER_COLORS[data['owner'] % len(PLAYER_COLORS)]
-        pygame.draw.line(screen, color, u, v, ROAD_WIDTH)
+def draw_building(surface, view, node, owner, building):
+    if owner is None:
+        return None
+    color = PLAYER_COLORS[owner % len(PLAYER_COLORS)]
+    radius = VERTEX_RADIUS if building == BuildingType.SETTLEMENT else VERTEX_RADIUS + 2
+    pos = view.vertex_positions[node]
+    rect = pygame.draw.circle(surface, color, pos, radius)
+    pygame.draw.circle(surface, (0, 0, 0), pos, radius, 1)
+    return rect
 
-    for node, data in game.graph.nodes(data=True):
-        if data['owner'] is not None:
-            color = PLAYER_COLORS[data['owner'] % len(PLAYER_COLORS)]
-            radius = VERTEX_RADIUS if data['building'] == BuildingType.SETTLEMENT else VERTEX_RADIUS + 2
-            pygame.draw.circle(screen, color, node, radius)
-            pygame.draw.circle(screen, (0, 0, 0), node, radius, 1)
+def robber_rect(game, view):
+    if game.robber_hex is None:
+        return None
+    x, y = view.hex_positions[game.robber_hex]
+    return pygame.Rect(int(x) - ROBBER_RADIUS, int(y) - ROBBER_RADIUS, 2 * ROBBER_RADIUS + 1, 2 * ROBBER_RADIUS + 1)
 
+def draw_robber(surface, game, view):
+    if game.robber_hex is not None:
+        robber_pos = view.hex_positions[game.robber_hex]
+        pygame.draw.circle(surface, (0, 0, 0), (int(robber_pos[0]), int(robber_pos[1])), ROBBER_RADIUS)
+
+def hud_lines(font, game, log=None):
+    """Napisy na ekranie jako lista (tekst, kolor, pozycja) - po niej widać czy coś się zmieniło
+
+    log to opcjonalny RingBufferSink z game/event_log.py, jego ostatnie wpisy są w prawym dolnym rogu.
+    """
     player = game.get_current_player()
+    lines = []
     turn_text = f"Gracz {game.current_player_idx + 1} ma turę :  (Punkty: {player['victory_points']})"
-    turn_label = font.render(turn_text, True, PLAYER_COLORS[game.current_player_idx % len(PLAYER_COLORS)])
-    screen.blit(turn_label, (10, 10))
+    lines.append((turn_text, PLAYER_COLORS[game.current_player_idx % len(PLAYER_COLORS)], (10, 10)))
 
     mode_text = "Faza gry: LPM - wioska, PPM -  roads, Spacja - koniec tury, Scroll - ulepsz do miasta, T - Trading"
-    mode_label = font.render(mode_text, True, (0, 0, 0))
-    screen.blit(mode_label, (10, 40))
+    lines.append((mode_text, (0, 0, 0), (10, 40)))
 
     if not game.initial_placement_phase:
         koszty_text = [
@@ -58,69 +125,186 @@ def render_game(screen, font, game):
         ]
         y_pos = HEIGHT - 120
         for text in koszty_text:
-            cost_label = font.render(text, True, (0, 0, 0))
-            screen.blit(cost_label, (10, y_pos))
+            lines.append((text, (0, 0, 0), (10, y_pos)))
             y_pos += 20
 
-    if game.trading_mode:
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-
-        if game.trade_stage == 0:
-            text = "Wybierz zasób który chcesz DOSTAĆ:"
-            options = [
-                "1 - Drewno",
-                "2 - Glina",
-                "3 - Owca",
-                "4 - Zboże",
-                "5 - Kamień",
-                "ESC - Anuluj"
-            ]
-        else:
-            text = f"Wybierz zasób który chcesz ODAĆ za {game.selected_trade_resource}:"
-            options = [
-                "1 - Drewno",
-                "2 - Glina",
-                "3 - Owca",
-                "4 - Zboże",
-                "5 - Kamień",
-                "ESC - Anuluj"
-            ]
-
-        dialog_width = 400
-        dialog_height = 200
-        dialog_x = (WIDTH - dialog_width) // 2
-        dialog_y = (HEIGHT - dialog_height) // 2
-
-        pygame.draw.rect(screen, (240, 240, 240), (dialog_x, dialog_y, dialog_width, dialog_height))
-        pygame.draw.rect(screen, (0, 0, 0), (dialog_x, dialog_y, dialog_width, dialog_height), 2)
-
-        text_label = font.render(text, True, (0, 0, 0))
-        screen.blit(text_label, (dialog_x + 20, dialog_y + 20))
-
-        option_y = dialog_y + 60
-        for option in options:
-            option_label = font.render(option, True, (0, 0, 0))
-            screen.blit(option_label, (dialog_x + 40, option_y))
-            option_y += 30
-
     if not game.initial_placement_phase and game.diceroll:
-        dice_text = f"Ostatni wynik: {game.diceroll}"
-        dice_label = font.render(dice_text, True, (0, 0, 0))
-        screen.blit(dice_label, (WIDTH - 150, 10))
-
+        lines.append((f"Ostatni wynik: {game.diceroll}", (0, 0, 0), (WIDTH - 150, 10)))
         resources_text = "Zasoby: " + ", ".join(
-            f"{res}: {count}" for res, count in player['resources'].items() if count > 0
+            f"{RESOURCE_TYPES[resource]}: {count}" for resource, count in enumerate(player['resources']) if count > 0
         )
-        resources_label = font.render(resources_text, True, PLAYER_COLORS[game.current_player_idx])
-        screen.blit(resources_label, (10, 70))
-
-    if game.robber_hex:
-        robber_pos = game.robber_hex['position']
-        pygame.draw.circle(screen, (0, 0, 0), (int(robber_pos[0]), int(robber_pos[1])), 15)
+        lines.append((resources_text, PLAYER_COLORS[game.current_player_idx], (10, 70)))
 
     if game.robber_phase:
         robber_text = "Select a hex to place the robber (click on a hex)"
-        robber_label = font.render(robber_text, True, (255, 0, 0))
-        screen.blit(robber_label, (WIDTH // 2 - robber_label.get_width() // 2, 50))
\ No newline at end of file
+        lines.append((robber_text, (255, 0, 0), (WIDTH // 2 - font.size(robber_text)[0] // 2, 50)))
+
+    # Pokazaninie jaka jest aktualna faza
+    if game.initial_placement_phase:
+        phase_text = "Faza początkowa - " + (
+            "Załóż osadę" if game.placement_stage == 0 else "Połóż drogę"
+        )
+        lines.append((phase_text, (255, 0, 0), (WIDTH // 2 - font.size(phase_text)[0] // 2, 10)))
+
+    if log is not None:
+        messages = log.messages(EVENT_LOG_LINES)
+        y_pos = HEIGHT - 20 * len(messages) - 20
+        for text in messages:
+            lines.append((text, (60, 60, 60), (LOG_X, y_pos)))
+            y_pos += 20
+    return lines
+
+def draw_hud(surface, font, lines):
+    rects = []
+    for text, color, pos in lines:
+        label = text_cache.render(font, text, color)
+        rects.append(surface.blit(label, pos))
+    return rects
+
+def draw_trade_dialog(surface, font, game):
+    surface.blit(get_overlay(surface.get_size()), (0, 0))
+
+    if game.trade_stage == 0:
+        text = "Wybierz zasób który chcesz DOSTAĆ:"
+    else:
+        text = f"Wybierz zasób który chcesz ODAĆ za {RESOURCE_TYPES[game.selected_trade_resource]}:"
+    options = [
+        "1 - Drewno",
+        "2 - Glina",
+        "3 - Owca",
+        "4 - Zboże",
+        "5 - Kamień",
+        "ESC - Anuluj"
+    ]
+
+    dialog_width = 400
+    dialog_height = 200
+    dialog_x = (WIDTH - dialog_width) // 2
+    dialog_y = (HEIGHT - dialog_height) // 2
+
+    pygame.draw.rect(surface, (240, 240, 240), (dialog_x, dialog_y, dialog_width, dialog_height))
+    pygame.draw.rect(surface, (0, 0, 0), (dialog_x, dialog_y, dialog_width, dialog_height), 2)
+
+    text_label = text_cache.render(font, text, (0, 0, 0))
+    surface.blit(text_label, (dialog_x + 20, dialog_y + 20))
+
+    option_y = dialog_y + 60
+    for option in options:
+        option_label = text_cache.render(font, option, (0, 0, 0))
+        surface.blit(option_label, (dialog_x + 40, option_y))
+        option_y += 30
+
+def render_game(screen, font, game, view, log=None):
+    """Rysuje całą klatkę od zera"""
+    draw_static_board(screen, font, game, view)
+    board = game.board
+    for edge, owner in enumerate(board.edge_owner):
+        if owner is not None:
+            draw_road(screen, view, edge, owner)
+    for node, owner in enumerate(board.vertex_owner):
+        draw_building(screen, view, node, owner, board.vertex_building[node])
+    draw_robber(screen, game, view)
+    draw_hud(screen, font, hud_lines(font, game, log))
+    if game.trading_mode:
+        draw_trade_dialog(screen, font, game)
+
+
+class BoardRenderer:
+    """Rysowanie tylko tego co się zmieniło
+
+    Hexy, numerki i puste drogi są narysowane raz na osobnej powierzchni, na którą potem
+    dorysowujemy zbudowane drogi i budynki. Co klatkę porównujemy stan z poprzednią klatką
+    i zwracamy tylko zmienione prostokąty dla pygame.display.update(rects).
+    """
+
+    def __init__(self, screen, font, view, log=None):
+        self.screen = screen
+        self.font = font
+        self.view = view
+        self.log = log
+        self.board_layer = None
+        self.edge_owner = None
+        self.vertex_state = None
+        self.robber = None
+        self.hud = None
+        self.hud_rects = []
+        self.trade = None
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Następna klatka narysuje cały ekran"""
+        self.full_redraw = True
+
+    def _build_board_layer(self, game):
+        self.board_layer = pygame.Surface(self.screen.get_size())
+        draw_static_board(self.board_layer, self.font, game, self.view)
+        self.edge_owner = [None] * len(game.board.edge_owner)
+        self.vertex_state = [(None, BuildingType.NONE)] * len(game.board.vertex_owner)
+
+    def _update_board_layer(self, game):
+        """Dorysowuje zmienione drogi i budynki, zwraca zmienione prostokąty"""
+        board = game.board
+        topology = board.topology
+        dirty = []
+        redraw_nodes = set()
+        for edge, owner in enumerate(board.edge_owner):
+            if owner != self.edge_owner[edge]:
+                self.edge_owner[edge] = owner
+                dirty.append(draw_road(self.board_layer, self.view, edge, owner))
+                redraw_nodes.update(topology.edge_vertices[edge])  # Budynek leży na drodze
+        for node, owner in enumerate(board.vertex_owner):
+            state = (owner, board.vertex_building[node])
+            if state != self.vertex_state[node] or node in redraw_nodes:
+                self.vertex_state[node] = state
+                rect = draw_building(self.board_layer, self.view, node, *state)
+                if rect:
+                    dirty.append(rect)
+        return dirty
+
+    def render(self, game):
+        """Rysuje klatkę i zwraca listę prostokątów do pygame.display.update"""
+        screen = self.screen
+        if self.board_layer is None:
+            self._build_board_layer(game)
+        full = self.full_redraw
+        self.full_redraw = False
+
+        dirty = self._update_board_layer(game)
+        robber = robber_rect(game, self.view)
+        if robber != self.robber:
+            dirty.extend(rect for rect in (self.robber, robber) if rect)
+            self.robber = robber
+
+        lines = hud_lines(self.font, game, self.log)
+        hud_changed = lines != self.hud
+        trade = (game.trading_mode, game.trade_stage, game.selected_trade_resource)
+        # Okno wymiany przykrywa cały ekran, więc przy nim i przy jego zamknięciu rysujemy wszystko
+        if trade != self.trade or (game.trading_mode and (dirty or hud_changed)):
+            full = True
+        self.trade = trade
+
+        if full:
+            screen.blit(self.board_layer, (0, 0))
+            draw_robber(screen, game, self.view)
+            self.hud = lines
+            self.hud_rects = draw_hud(screen, self.font, lines)
+            if game.trading_mode:
+                draw_trade_dialog(screen, self.font, game)
+            return [screen.get_rect()]
+
+        if hud_changed:
+            dirty.extend(self.hud_rects)
+        for rect in dirty:
+            screen.blit(self.board_layer, rect, rect)
+        if robber and robber.collidelist(dirty) != -1:
+            draw_robber(screen, game, self.view)
+        if hud_changed:
+            self.hud = lines
+            self.hud_rects = draw_hud(screen, self.font, lines)
+            dirty.extend(self.hud_rects)
+        elif dirty:
+            # Odświeżony kawałek planszy mógł zamazać napis
+            for rect, (text, color, pos) in zip(self.hud_rects, lines):
+                if rect.collidelist(dirty) != -1:
+                    screen.blit(text_cache.render(self.font, text, color), pos)
+        return dirty
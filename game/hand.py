@@ -0,0 +1,42 @@
+"""Ręka gracza jako wektor liczb o stałej długości, indeksowany przez Resource
+
+player['resources'][Resource.GLINA] to ile gracz ma gliny. Koszty budowy są takimi samymi
+wektorami (constants.py), więc sprawdzenie czy stać i zapłata to jedno przejście po wektorze.
+affordable() robi to samo w NumPy dla wielu rąk naraz (np. z wielu stanów gry).
+"""
+import numpy as np
+
+from .constants import RESOURCE_TYPES, ROAD_COST, SETTLEMENT_COST, CITY_COST
+from .enums import Resource
+
+NUM_RESOURCES = len(Resource)
+RESOURCE_BY_NAME = {RESOURCE_TYPES[resource]: resource for resource in Resource}
+# Kody pól planszy wspólne dla wszystkich modułów: zasób to jego Resource, pustynia następny numer
+DESERT = NUM_RESOURCES
+HEX_CODES = {**RESOURCE_BY_NAME, 'pustynia': DESERT}
+HEX_NAMES = list(HEX_CODES)  # Kod -> nazwa
+# Wiersze w kolejności droga, wioska, miasto (jak kolumny wyniku affordable_builds)
+BUILD_COSTS = np.array([ROAD_COST, SETTLEMENT_COST, CITY_COST], dtype=np.int32)
+
+
+def empty_hand():
+    return [0] * NUM_RESOURCES
+
+
+def can_afford(hand, cost):
+    return all(have >= need for have, need in zip(hand, cost))
+
+
+def pay(hand, cost):
+    """Odejmuje koszt od ręki w miejscu (bez sprawdzania, najpierw can_afford)"""
+    hand[:] = [have - need for have, need in zip(hand, cost)]
+
+
+def affordable(hands, cost):
+    """hands (..., NUM_RESOURCES) -> maska (...), czy stać na cost"""
+    return (np.asarray(hands) >= np.asarray(cost)).all(axis=-1)
+
+
+def affordable_builds(hands):
+    """hands (..., NUM_RESOURCES) -> maska (..., 3): czy stać na drogę, wioskę, miasto"""
+    return (np.asarray(hands)[..., None, :] >= BUILD_COSTS).all(axis=-1)
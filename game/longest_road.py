@@ -0,0 +1,150 @@
+class LongestRoadTracker:
+    """Najdłuższa droga liczona przyrostowo
+
+    Drogi gracza są podzielone na spójne kawałki (komponenty). Nowa droga przelicza tylko
+    komponent, do którego trafiła, a cudza wioska postawiona na drodze przelicza tylko
+    komponenty, które przez ten wierzchołek przechodziły. Długość każdego komponentu jest
+    trzymana w cache'u.
+    """
+    __slots__ = ('board', 'edge_component', 'components', 'player_components', 'player_lengths',
+                 'next_component', 'used')
+
+    def __init__(self, board):
+        self.board = board
+        self.edge_component = [None] * board.topology.num_edges
+        self.components = {}  # id komponentu -> (gracz, krawędzie, długość)
+        self.player_components = {}  # gracz -> zbiór id komponentów
+        self.player_lengths = {}  # gracz -> najdłuższa droga
+        self.next_component = 0
+        self.used = [False] * board.topology.num_edges  # Znaczniki DFS, zmieniane w miejscu
+
+    def length(self, player_id):
+        return self.player_lengths.get(player_id, 0)
+
+    def add_road(self, edge, player_id):
+        """Wywołać po postawieniu drogi, zwraca nową najdłuższą drogę gracza"""
+        self._rebuild_from(edge, player_id)
+        return self._update_player(player_id)
+
+    def snapshot(self):
+        return (tuple(self.edge_component), tuple(self.components.items()),
+                tuple(self.player_lengths.items()), self.next_component)
+
+    def restore(self, state):
+        edge_component, components, player_lengths, self.next_component = state
+        self.edge_component[:] = edge_component
+        self.components = dict(components)
+        self.player_lengths = dict(player_lengths)
+        self.player_components = {}
+        for component, (player_id, _, _) in self.components.items():
+            self.player_components.setdefault(player_id, set()).add(component)
+
+    def rebuild(self):
+        """Liczy wszystko od zera z planszy (np. po wczytaniu zapisanego stanu)"""
+        edge_owner = self.board.edge_owner
+        self.edge_component[:] = [None] * len(edge_owner)
+        self.components = {}
+        self.player_components = {}
+        self.player_lengths = {}
+        for edge, player_id in enumerate(edge_owner):
+            if player_id is not None and self.edge_component[edge] is None:
+                self._rebuild_from(edge, player_id)
+        for player_id in set(owner for owner in edge_owner if owner is not None):
+            self._update_player(player_id)
+
+    def cut_at_vertex(self, vertex, owner):
+        """Wywołać po postawieniu wioski, zwraca graczy, którym mogła się skrócić droga"""
+        board = self.board
+        touched = set()
+        for edge in board.topology.vertex_edges[vertex]:
+            player_id = board.edge_owner[edge]
+            if player_id is not None and player_id != owner:
+                touched.add(player_id)
+                self._drop_component(self.edge_component[edge])
+        # Każdy kawałek po przecięciu dotyka tego wierzchołka, więc wystarczy zacząć od jego krawędzi
+        for edge in board.topology.vertex_edges[vertex]:
+            player_id = board.edge_owner[edge]
+            if player_id in touched and self.edge_component[edge] is None:
+                self._rebuild_from(edge, player_id)
+        for player_id in touched:
+            self._update_player(player_id)
+        return touched
+
+    def _blocked(self, vertex, player_id):
+        owner = self.board.vertex_owner[vertex]
+        return owner is not None and owner != player_id
+
+    def _drop_component(self, component):
+        if component is None or component not in self.components:
+            return
+        player_id, edges, _ = self.components.pop(component)
+        self.player_components[player_id].discard(component)
+        for edge in edges:
+            self.edge_component[edge] = None
+
+    def _rebuild_from(self, start_edge, player_id):
+        """Zbiera komponent zawierający krawędź (przez cudze wioski nie przechodzimy) i liczy jego długość"""
+        topology = self.board.topology
+        edge_owner = self.board.edge_owner
+        edges = [start_edge]
+        seen = {start_edge}
+        stack = [start_edge]
+        while stack:
+            edge = stack.pop()
+            for vertex in topology.edge_vertices[edge]:
+                if self._blocked(vertex, player_id):
+                    continue
+                for other in topology.vertex_edges[vertex]:
+                    if other not in seen and edge_owner[other] == player_id:
+                        seen.add(other)
+                        edges.append(other)
+                        stack.append(other)
+
+        for edge in edges:
+            self._drop_component(self.edge_component[edge])
+
+        component = self.next_component
+        self.next_component += 1
+        for edge in edges:
+            self.edge_component[edge] = component
+        self.components[component] = (player_id, tuple(edges), self._longest_trail(edges, component, player_id))
+        self.player_components.setdefault(player_id, set()).add(component)
+
+    def _longest_trail(self, edges, component, player_id):
+        """DFS po krawędziach (każda droga raz), zaczynając z każdego końca drogi w komponencie"""
+        topology = self.board.topology
+        starts = {vertex for edge in edges for vertex in topology.edge_vertices[edge]}
+        best = 0
+        for vertex in starts:
+            length = self._trail_from(vertex, component, player_id)
+            if length > best:
+                best = length
+                if best == len(edges):
+                    break
+        return best
+
+    def _trail_from(self, vertex, component, player_id):
+        topology = self.board.topology
+        edge_component = self.edge_component
+        used = self.used
+        best = 0
+        for edge in topology.vertex_edges[vertex]:
+            if used[edge] or edge_component[edge] != component:
+                continue
+            u, v = topology.edge_vertices[edge]
+            other = v if u == vertex else u
+            used[edge] = True
+            if self._blocked(other, player_id):
+                length = 1
+            else:
+                length = 1 + self._trail_from(other, component, player_id)
+            used[edge] = False
+            if length > best:
+                best = length
+        return best
+
+    def _update_player(self, player_id):
+        components = self.components
+        length = max((components[c][2] for c in self.player_components.get(player_id, ())), default=0)
+        self.player_lengths[player_id] = length
+        return length
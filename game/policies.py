@@ -0,0 +1,37 @@
+from .enums import ActionType
+
+# Kolejność, w jakiej chciwy gracz wybiera ruchy
+GREEDY_PRIORITY = {
+    ActionType.ROBBER: 0,
+    ActionType.CITY: 0,
+    ActionType.SETTLEMENT: 1,
+    ActionType.ROAD: 2,
+    ActionType.TRADE: 3,
+    ActionType.END_TURN: 4,
+}
+
+
+class RandomPolicy:
+    """Losowy legalny ruch"""
+
+    def choose_action(self, game, actions, rng):
+        return rng.choice(actions)
+
+
+class GreedyPolicy:
+    """Miasto > wioska > droga > wymiana > koniec tury, wymienia na zasób którego ma najmniej"""
+
+    def choose_action(self, game, actions, rng):
+        best = min(GREEDY_PRIORITY[action[0]] for action in actions)
+        candidates = [action for action in actions if GREEDY_PRIORITY[action[0]] == best]
+        if candidates[0][0] == ActionType.TRADE:
+            resources = game.get_current_player()['resources']
+            fewest = min(resources[action[2]] for action in candidates)
+            candidates = [action for action in candidates if resources[action[2]] == fewest]
+        return rng.choice(candidates)
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'greedy': GreedyPolicy,
+}
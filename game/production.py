@@ -0,0 +1,59 @@
+from .hand import HEX_CODES
+
+
+class ProductionIndex:
+    """Indeks produkcji: dla każdego wyniku kostek to, co trzeba wypłacić (gracz, zasób, ilość)
+
+    Budowany raz z hexów, a potem aktualizowany przy budowie wioski, mieście i ruchu złodzieja,
+    więc rzut kostką kosztuje tyle, ile jest budynków na tym numerku, a nie tyle, ile jest hexów.
+    """
+    __slots__ = ('hex_tokens', 'hex_resources', 'vertex_hexes', 'hex_payouts', 'by_roll', 'robber_hex')
+
+    def __init__(self, hexes, topology, robber_hex=None):
+        self.hex_tokens = [hex_data['token'] for hex_data in hexes]
+        self.hex_resources = [HEX_CODES[hex_data['resource']] for hex_data in hexes]  # Resource, pustynia = DESERT
+        self.vertex_hexes = topology.vertex_hexes
+        self.hex_payouts = [{} for _ in hexes]  # hex -> {wierzchołek: (gracz, zasób, ilość)}
+        self.by_roll = [{} for _ in range(13)]  # rzut -> {(hex, wierzchołek): (gracz, zasób, ilość)}
+        self.robber_hex = robber_hex
+
+    def set_building(self, vertex, player_id, amount):
+        """Wioska daje 1, miasto 2 - wywołać przy budowie wioski i przy ulepszeniu"""
+        for hex_id in self.vertex_hexes[vertex]:
+            token = self.hex_tokens[hex_id]
+            if token is None:
+                continue
+            payout = (player_id, self.hex_resources[hex_id], amount)
+            self.hex_payouts[hex_id][vertex] = payout
+            if hex_id != self.robber_hex:
+                self.by_roll[token][(hex_id, vertex)] = payout
+
+    def move_robber(self, hex_id):
+        """Złodziej blokuje nowy hex, a stary zaczyna znowu produkować"""
+        old_hex = self.robber_hex
+        self.robber_hex = hex_id
+        if old_hex is not None and self.hex_tokens[old_hex] is not None:
+            roll_payouts = self.by_roll[self.hex_tokens[old_hex]]
+            for vertex, payout in self.hex_payouts[old_hex].items():
+                roll_payouts[(old_hex, vertex)] = payout
+        if hex_id is not None and self.hex_tokens[hex_id] is not None:
+            roll_payouts = self.by_roll[self.hex_tokens[hex_id]]
+            for vertex in self.hex_payouts[hex_id]:
+                del roll_payouts[(hex_id, vertex)]
+
+    def snapshot(self):
+        return self.robber_hex, tuple(tuple(payouts.items()) for payouts in self.hex_payouts)
+
+    def restore(self, state):
+        self.robber_hex, hex_payouts = state
+        self.hex_payouts = [dict(payouts) for payouts in hex_payouts]
+        self.by_roll = [{} for _ in range(13)]
+        for hex_id, payouts in enumerate(self.hex_payouts):
+            token = self.hex_tokens[hex_id]
+            if token is None or hex_id == self.robber_hex:
+                continue
+            for vertex, payout in payouts.items():
+                self.by_roll[token][(hex_id, vertex)] = payout
+
+    def payouts(self, dice_roll):
+        return self.by_roll[dice_roll].values()
@@ -0,0 +1,203 @@
+"""Opcjonalne mierzenie czasu metod GameState i klatek gry
+
+Domyślnie wyłączone i wtedy nic nie kosztuje: enable() podmienia metody klasy na wersje
+z pomiarem czasu, a disable() przywraca oryginały. Czasy są z wywołaniami w środku
+(np. apply_action zawiera build_road). Przykład:
+
+    from game.profiling import profiler
+    profiler.enable()
+    ...
+    print(profiler.report())
+"""
+import bisect
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+from .game_state import GameState
+
+# Metody GameState, które mierzymy po włączeniu
+PROFILED_METHODS = (
+    'legal_actions', 'apply_action', 'next_turn', 'roll_dice', 'distribute_resources',
+    'build_settlement', 'build_road', 'upgrade_to_city', 'trade_with_bank',
+    'handle_robber', 'place_robber', 'steal_resource',
+    'calculate_longest_roads', 'update_longest_road_card', 'snapshot', 'restore',
+)
+MAX_SAMPLES = 10000  # Ile ostatnich czasów trzymamy do percentyli
+# Granice przedziałów histogramu klatek (ms), ostatni przedział to wszystko powyżej
+FRAME_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class TimingStats:
+    """Liczba wywołań, suma, maksimum i ostatnie próbki do percentyli"""
+    __slots__ = ('calls', 'total', 'max', 'samples')
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+        self.clear()
+
+    def clear(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples.clear()
+
+    def add(self, seconds):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def summary(self):
+        samples = sorted(self.samples)
+        return {
+            'calls': self.calls,
+            'total_ms': self.total * 1e3,
+            'mean_us': self.total / self.calls * 1e6 if self.calls else 0.0,
+            'p50_us': percentile(samples, 0.5) * 1e6,
+            'p95_us': percentile(samples, 0.95) * 1e6,
+            'p99_us': percentile(samples, 0.99) * 1e6,
+            'max_us': self.max * 1e6
+        }
+
+
+class FrameHistogram(TimingStats):
+    """Czasy klatek, dodatkowo policzone w przedziałach FRAME_BUCKETS_MS"""
+    __slots__ = ('buckets',)
+
+    def clear(self):
+        super().clear()
+        self.buckets = [0] * (len(FRAME_BUCKETS_MS) + 1)
+
+    def add(self, seconds):
+        super().add(seconds)
+        self.buckets[bisect.bisect_left(FRAME_BUCKETS_MS, seconds * 1e3)] += 1
+
+    def summary(self):
+        summary = super().summary()
+        labels = [f"<={limit}ms" for limit in FRAME_BUCKETS_MS] + [f">{FRAME_BUCKETS_MS[-1]}ms"]
+        summary['histogram'] = dict(zip(labels, self.buckets))
+        return summary
+
+
+class Profiler:
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.enabled = False
+        self.methods = {}  # nazwa -> TimingStats
+        self.frames = FrameHistogram(max_samples)
+        self.lock = threading.Lock()  # Zrzut okresowy czyta z innego wątku
+        self.originals = []  # (obiekt, atrybut, oryginał) do przywrócenia w disable()
+        self.dump_thread = None
+        self.dump_stop = None
+
+    def enable(self):
+        """Podmienia metody GameState (i rysowanie, jeśli jest pygame) na wersje z pomiarem"""
+        if self.enabled:
+            return
+        targets = [(GameState, name, name) for name in PROFILED_METHODS]
+        try:
+            from . import graphics
+            targets.append((graphics, 'render_game', 'render_game'))
+            targets.append((graphics.BoardRenderer, 'render', 'BoardRenderer.render'))
+        except ImportError:
+            pass  # Symulacja bez pygame
+
+        for owner, attribute, name in targets:
+            original = getattr(owner, attribute)
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, self._timed(name, original))
+        self.enabled = True
+
+    def disable(self):
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+        self.enabled = False
+        self.stop_periodic_dump()
+
+    def _timed(self, name, method):
+        stats = self.methods.setdefault(name, TimingStats(self.max_samples))
+        lock = self.lock
+        perf_counter = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                with lock:
+                    stats.add(elapsed)
+        return timed
+
+    def frame(self, seconds):
+        """Czas jednej klatki z pętli gry"""
+        with self.lock:
+            self.frames.add(seconds)
+
+    def reset(self):
+        with self.lock:
+            for stats in self.methods.values():
+                stats.clear()
+            self.frames.clear()
+
+    def stats(self):
+        """Słownik z podsumowaniem: metody (tylko wywołane), klatki"""
+        with self.lock:
+            return {
+                'methods': {name: stats.summary() for name, stats in self.methods.items() if stats.calls},
+                'frames': self.frames.summary()
+            }
+
+    def report(self):
+        """Tabela do wypisania, metody posortowane po łącznym czasie"""
+        stats = self.stats()
+        lines = [f"{'metoda':28s} {'wywołań':>9s} {'razem ms':>10s} {'średnio us':>11s} "
+                 f"{'p50 us':>9s} {'p95 us':>9s} {'p99 us':>9s}"]
+        methods = sorted(stats['methods'].items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        for name, summary in methods:
+            lines.append(f"{name:28s} {summary['calls']:9d} {summary['total_ms']:10.1f} {summary['mean_us']:11.1f} "
+                         f"{summary['p50_us']:9.1f} {summary['p95_us']:9.1f} {summary['p99_us']:9.1f}")
+        frames = stats['frames']
+        if frames['calls']:
+            lines.append(f"klatki: {frames['calls']}, p50 {frames['p50_us'] / 1e3:.2f} ms, "
+                         f"p99 {frames['p99_us'] / 1e3:.2f} ms, max {frames['max_us'] / 1e3:.2f} ms")
+            lines.append("  " + ", ".join(f"{label}: {count}" for label, count in frames['histogram'].items()))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.stats(), f, indent=2)
+
+    def start_periodic_dump(self, path, interval):
+        """Co interval sekund zapisuje stats() do pliku JSON (w osobnym wątku)"""
+        self.stop_periodic_dump()
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.dump(path)
+
+        self.dump_stop = stop
+        self.dump_thread = threading.Thread(target=loop, daemon=True)
+        self.dump_thread.start()
+
+    def stop_periodic_dump(self):
+        if self.dump_thread is not None:
+            self.dump_stop.set()
+            self.dump_thread.join()
+            self.dump_thread = None
+
+
+profiler = Profiler()
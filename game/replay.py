@@ -0,0 +1,90 @@
+"""Analiza zapisanych gier: zdarzenia i podsumowania tur, strumieniowo z pliku
+
+Wszystko tu to generatory: z pliku czytana jest jedna gra naraz, odtwarzana ruch po ruchu,
+a z jej zdarzeń od razu składane są podsumowania tur. Pamięć nie rośnie z wielkością pliku.
+"""
+from .encoding import read_games, replay_game, state_num_players
+from .enums import EventType
+from .hand import empty_hand
+
+
+def game_events(seed, fair, state, actions):
+    """Zdarzenia (EventType, dane) jednej zapisanej gry, w kolejności w jakiej zaszły"""
+    pending = []
+
+    def listener(event_type, data):
+        pending.append((event_type, data))
+
+    for _ in replay_game(seed, fair, state, actions, listeners=[listener]):
+        yield from pending
+        pending.clear()
+
+
+def _new_turn(number, num_players):
+    return {
+        'turn': number,
+        'player': None,
+        'roll': None,
+        'income': [empty_hand() for _ in range(num_players)],  # Zasoby z kostek (i z rozstawiania), indeksy Resource
+        'built': [0] * num_players,
+        'longest_road': [],  # Zmiany właściciela: (nowy gracz albo None, długość)
+        'robber': None,
+        'victory_points': None
+    }
+
+
+def turn_summaries(events, num_players):
+    """Podsumowanie każdej tury ze strumienia zdarzeń
+
+    Tura kończy się na TURN_ENDED, pierwsza zawiera też rozstawianie. Złodziej to słownik
+    z hexem, liczbą odrzuconych kart każdego gracza i kradzieżą (ofiara, zasób) albo None.
+    """
+    victory_points = [0] * num_players
+    number = 0
+    turn = _new_turn(number, num_players)
+    changed = False
+    for event_type, data in events:
+        changed = True
+        if event_type == EventType.DICE_ROLLED:
+            turn['roll'] = data['roll']
+            if data['roll'] == 7:
+                turn['robber'] = {'hex': None, 'discarded': [0] * num_players, 'stolen': None}
+        elif event_type == EventType.PRODUCTION:
+            turn['income'][data['player']][data['resource']] += data['amount']
+        elif event_type == EventType.DISCARD:
+            turn['robber']['discarded'][data['player']] += data['count']
+        elif event_type == EventType.ROBBER_MOVED:
+            turn['robber']['hex'] = data['hex']
+        elif event_type == EventType.STEAL:
+            turn['robber']['stolen'] = (data['victim'], data['resource'])
+        elif event_type in (EventType.SETTLEMENT_BUILT, EventType.CITY_BUILT):
+            turn['built'][data['player']] += 1
+            victory_points[data['player']] += 1
+        elif event_type == EventType.ROAD_BUILT:
+            turn['built'][data['player']] += 1
+        elif event_type == EventType.LONGEST_ROAD:
+            turn['longest_road'].append((data['player'], data['length']))
+            if data['previous'] is not None:
+                victory_points[data['previous']] -= 2
+            if data['player'] is not None:
+                victory_points[data['player']] += 2
+        elif event_type == EventType.TURN_ENDED:
+            turn['player'] = data['player']
+            turn['victory_points'] = list(victory_points)
+            yield turn
+            number += 1
+            turn = _new_turn(number, num_players)
+            changed = False
+
+    # Gra mogła się skończyć w środku tury (np. wygrana po budowie)
+    if changed:
+        turn['victory_points'] = list(victory_points)
+        yield turn
+
+
+def file_turn_summaries(path):
+    """Podsumowania tur wszystkich gier z pliku, każde z numerem gry pod 'game'"""
+    for game_index, (seed, fair, state, actions) in enumerate(read_games(path)):
+        for summary in turn_summaries(game_events(seed, fair, state, actions), state_num_players(state)):
+            summary['game'] = game_index
+            yield summary
@@ -0,0 +1,104 @@
+"""Ocena miejsc na złodzieja bez symulowania i losowanie kart prosto z liczników
+
+Dla każdego hexa: ile produkcji (na 36 rzutów) zabiera złodziej każdemu graczowi, liczone
+z indeksu produkcji, i dokładny rozkład tego co da się ukraść, liczony z ilości kart ofiar.
+Losowanie kart (kradzież, odrzucanie przy 7) idzie prosto po wektorze ręki (indeksy Resource),
+więc nie rozwijamy ręki w listę kart.
+"""
+from .analysis import TOKEN_PIPS
+from .enums import BuildingType, Resource
+
+
+def hand_counts(player):
+    """Kopia ręki gracza (ile ma każdego zasobu, indeksy Resource)"""
+    return list(player['resources'])
+
+
+def draw_from_counts(rng, counts, k):
+    """k kart losowanych bez zwracania z ręki o danych ilościach (rozkład wielowymiarowy hipergeometryczny)
+
+    Zwraca ile kart każdego zasobu wylosowano. Każda karta to jeden rzut rng.randrange
+    i przejście po licznikach, czyli O(k * zasoby) zamiast O(kart w ręce).
+    """
+    remaining = list(counts)
+    total = sum(remaining)
+    drawn = [0] * len(remaining)
+    for _ in range(min(k, total)):
+        pick = rng.randrange(total)
+        for resource, count in enumerate(remaining):
+            if pick < count:
+                remaining[resource] -= 1
+                drawn[resource] += 1
+                break
+            pick -= count
+        total -= 1
+    return drawn
+
+
+def robber_targets(game):
+    """Hexy, na które można postawić złodzieja (nie pustynia i nie tam gdzie stoi)"""
+    return [hex_data['id'] for hex_data in game.hexes
+            if hex_data['id'] != game.robber_hex and hex_data['resource'] != 'pustynia']
+
+
+def robber_victims(game, hex_id, thief_id=None):
+    """Gracze z budynkiem przy hexie, od których można ukraść (bez złodzieja), posortowani"""
+    if thief_id is None:
+        thief_id = game.current_player_idx
+    board = game.board
+    victims = set()
+    for vertex in game.hexes[hex_id]['vertices']:
+        owner = board.vertex_owner[vertex]
+        if owner is not None and owner != thief_id and board.vertex_building[vertex] != BuildingType.NONE:
+            victims.add(owner)
+    return sorted(victims)
+
+
+def income_denied(game, hex_id):
+    """Ile zasobów na 36 rzutów hex daje każdemu graczowi, czyli ile zabierze mu tam złodziej"""
+    denied = [0] * len(game.players)
+    token = game.hexes[hex_id]['token']
+    if not token:
+        return denied
+    pips = TOKEN_PIPS[token]
+    for player_id, _, amount in game.production.hex_payouts[hex_id].values():
+        denied[player_id] += amount * pips
+    return denied
+
+
+def steal_distribution(game, hex_id, thief_id=None):
+    """Dokładny rozkład kradzieży: {(ofiara, zasób albo None jak nie ma kart): prawdopodobieństwo}
+
+    Ofiara jest losowana równo spośród robber_victims, a karta proporcjonalnie do ilości.
+    Pusty słownik, jak nie ma od kogo kraść.
+    """
+    victims = robber_victims(game, hex_id, thief_id)
+    distribution = {}
+    for victim_id in victims:
+        counts = hand_counts(game.players[victim_id])
+        total = sum(counts)
+        if total == 0:
+            distribution[(victim_id, None)] = 1 / len(victims)
+            continue
+        for resource, count in zip(Resource, counts):
+            if count:
+                distribution[(victim_id, resource)] = count / (total * len(victims))
+    return distribution
+
+
+def evaluate_robber(game, thief_id=None):
+    """Ocena każdego legalnego miejsca na złodzieja, bez symulacji
+
+    Lista słowników: hex, denied (zabrana produkcja każdego gracza na 36 rzutów),
+    steal (rozkład z steal_distribution) i steal_chance (szansa, że coś uda się ukraść).
+    """
+    options = []
+    for hex_id in robber_targets(game):
+        steal = steal_distribution(game, hex_id, thief_id)
+        options.append({
+            'hex': hex_id,
+            'denied': income_denied(game, hex_id),
+            'steal': steal,
+            'steal_chance': sum(p for (_, resource), p in steal.items() if resource is not None)
+        })
+    return options
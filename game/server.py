@@ -0,0 +1,191 @@
+"""Serwer gry na asyncio: wiele stołów (GameState) w jednym procesie
+
+Protokół to linie JSON po TCP. Od klienta:
+    {"type": "join", "table": "nazwa"}   siada na wolnym miejscu (stół powstaje przy pierwszym graczu)
+    {"type": "action", "action": 57}     ruch jako numer z features.action_index
+Od serwera:
+    joined    pełny stan raz, przy wejściu: table, player, players, state (diff.full_state bez
+              cudzych kart), cards (ile kart ma każdy gracz)
+    diff      po każdym ruchu tylko różnice zebrane przez GameState: diffs (diff.seat_diffs, cudze
+              ręce jako liczba kart); gracz, który ma ruch, dostaje też legal (numery legalnych ruchów)
+    finished  koniec gry: winner (None, jak skończyły się tury)
+    error     reason
+Gra rusza, jak wszystkie miejsca są zajęte. Ruchy na jednym stole idą po kolei (asyncio.Lock
+stołu) i liczą się od razu w pętli - ruch to kilka mikrosekund czystego Pythona, więc pula
+wątków tylko by dokładała przełączania. Na opróżnienie buforów graczy (drain) czekamy już
+po zwolnieniu blokady, żeby jeden zawieszony klient nie zatrzymywał całego stołu.
+"""
+import asyncio
+import json
+
+from .constants import PLAYERS_NUMBERS, SERVER_MAX_TURNS
+from .diff import card_counts, full_state, seat_diffs
+from .enums import ActionType
+from .features import ACTION_SIZE, action_index, index_to_action
+from .game_state import create_game
+
+
+def encode_message(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+class Table:
+    def __init__(self, name, num_players, seed=None, max_turns=SERVER_MAX_TURNS, listeners=()):
+        self.name = name
+        self.game = create_game(num_players, rng=seed)
+        for listener in listeners:
+            self.game.add_listener(listener)
+        self.game.start_initial_placement()
+        self.game.record_diffs()
+        self.seats = [None] * num_players  # StreamWriter gracza na każdym miejscu albo None
+        self.lock = asyncio.Lock()
+        self.turns = 0
+        self.max_turns = max_turns
+        self.finished = False
+        self.started = False
+
+    @property
+    def full(self):
+        return all(writer is not None for writer in self.seats)
+
+    @property
+    def empty(self):
+        return all(writer is None for writer in self.seats)
+
+    def legal(self):
+        return [action_index(action) for action in self.game.legal_actions()]
+
+
+class GameServer:
+    """Stoły po nazwie i obsługa połączeń, handle_client idzie do asyncio.start_server
+
+    event_sink (BatchedFileSink) dostaje zdarzenia gier wszystkich stołów, oznaczone nazwą stołu.
+    """
+
+    def __init__(self, num_players=PLAYERS_NUMBERS, seed=None, max_turns=SERVER_MAX_TURNS, event_sink=None):
+        self.num_players = num_players
+        self.seed = seed
+        self.max_turns = max_turns
+        self.event_sink = event_sink
+        self.tables = {}
+        self.created = 0
+        self.stats = {'actions': 0, 'rejected': 0, 'messages': 0, 'bytes': 0}
+
+    def send(self, writer, message):
+        data = encode_message(message)
+        self.stats['messages'] += 1
+        self.stats['bytes'] += len(data)
+        writer.write(data)
+
+    async def handle_client(self, reader, writer):
+        table = seat = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    self.send(writer, {'type': 'error', 'reason': 'niepoprawny JSON'})
+                    continue
+                kind = message.get('type') if isinstance(message, dict) else None
+                if kind == 'join' and table is None:
+                    table, seat = await self.join(str(message.get('table')), writer)
+                elif kind == 'action' and table is not None:
+                    await self.play(table, seat, message.get('action'))
+                else:
+                    self.send(writer, {'type': 'error', 'reason': f"nieoczekiwana wiadomość: {kind}"})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if table is not None:
+                self.leave(table, seat)
+            writer.close()
+
+    async def join(self, name, writer):
+        """Sadza gracza na pierwszym wolnym miejscu, zwraca (stół, miejsce) albo (None, None)"""
+        table = self.tables.get(name)
+        if table is None:
+            seed = None if self.seed is None else self.seed + self.created
+            listeners = [self.event_sink.listener(name)] if self.event_sink else ()
+            table = self.tables[name] = Table(name, self.num_players, seed, self.max_turns, listeners)
+            self.created += 1
+        writers = []
+        async with table.lock:
+            if table.full or table.finished:
+                self.send(writer, {'type': 'error', 'reason': f"stół {name} jest zajęty"})
+                return None, None
+            seat = table.seats.index(None)
+            table.seats[seat] = writer
+            message = {'type': 'joined', 'table': name, 'player': seat, 'players': len(table.seats),
+                       'state': full_state(table.game, seat), 'cards': card_counts(table.game)}
+            if table.started and table.game.current_player_idx == seat:
+                message['legal'] = table.legal()  # Wraca do gry w swojej turze
+            self.send(writer, message)
+            if table.full and not table.started:
+                table.started = True
+                writers = self.publish(table)
+        await self.drain(writers)
+        return table, seat
+
+    def leave(self, table, seat):
+        table.seats[seat] = None
+        if table.empty and self.tables.get(table.name) is table:
+            del self.tables[table.name]
+
+    async def play(self, table, seat, index):
+        async with table.lock:
+            game = table.game
+            if table.finished or not table.started:
+                reason = "gra się nie toczy"
+            elif seat != game.current_player_idx:
+                reason = "nie twoja tura"
+            elif not isinstance(index, int) or not 0 <= index < ACTION_SIZE:
+                reason = f"nieznany ruch: {index}"
+            elif index not in set(table.legal()):
+                reason = "ruch niedozwolony"
+            else:
+                reason = None
+            if reason is not None:
+                self.stats['rejected'] += 1
+                self.send(table.seats[seat], {'type': 'error', 'reason': reason})
+                return
+
+            action = index_to_action(index)
+            game.apply_action(action)
+            self.stats['actions'] += 1
+            if action[0] == ActionType.END_TURN:
+                table.turns += 1
+            writers = self.publish(table)
+        await self.drain(writers)
+
+    def publish(self, table):
+        """Wysyła wszystkim przy stole różnice od ostatniego razu, a graczowi z ruchem legalne ruchy
+
+        Tylko wpisuje do buforów, zwraca połączenia do drain() - wołać po zwolnieniu table.lock.
+        """
+        game = table.game
+        diffs = game.take_diffs()
+        winner = game.get_winner()
+        table.finished = winner is not None or table.turns >= table.max_turns
+        current = game.current_player_idx
+        writers = [writer for writer in table.seats if writer is not None]
+        for seat, writer in enumerate(table.seats):
+            if writer is None:
+                continue
+            message = {'type': 'diff', 'diffs': seat_diffs(diffs, seat)}
+            if seat == current and not table.finished:
+                message['legal'] = table.legal()
+            self.send(writer, message)
+            if table.finished:
+                self.send(writer, {'type': 'finished', 'winner': winner})
+        return writers
+
+    @staticmethod
+    async def drain(writers):
+        await asyncio.gather(*(writer.drain() for writer in writers), return_exceptions=True)
+
+    async def serve(self, host, port, **kwargs):
+        return await asyncio.start_server(self.handle_client, host, port, **kwargs)
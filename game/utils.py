@@ -20,12 +20,51 @@ def rounded_pos(pos):
     return (round(pos[0]), round(pos[1]))
 
 
-def find_closest_node(pos, nodes, threshold=20):
+# Domyślne odległości (w pikselach), w jakich łapie się kliknięcie
+NODE_THRESHOLD = 20
+EDGE_THRESHOLD = 15
+HEX_THRESHOLD = 50
+
+
+class SpatialGrid:
+    """Siatka kubełków do szukania kliknięć
+
+    Każdy obiekt trafia do wszystkich komórek, które są w zasięgu threshold od niego,
+    więc zapytanie o punkt sprawdza tylko jedną komórkę.
+    """
+
+    def __init__(self, threshold, cell_size=None):
+        self.threshold = threshold
+        self.cell_size = cell_size or threshold
+        self.cells = {}
+
+    def insert(self, item, min_x, min_y, max_x, max_y):
+        size = self.cell_size
+        t = self.threshold
+        for cx in range(math.floor((min_x - t) / size), math.floor((max_x + t) / size) + 1):
+            for cy in range(math.floor((min_y - t) / size), math.floor((max_y + t) / size) + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def query(self, pos):
+        size = self.cell_size
+        return self.cells.get((math.floor(pos[0] / size), math.floor(pos[1] / size)), ())
+
+
+def _candidates(grid, pos, threshold, count):
+    # Siatka jest zbudowana dla swojego progu, dla większego trzeba sprawdzić wszystko
+    if threshold <= grid.threshold:
+        return grid.query(pos)
+    return range(count)
+
+
+def find_closest_node(pos, view, threshold=NODE_THRESHOLD):
+    """Zwraca id najbliższego wierzchołka (albo None)"""
     mx, my = pos
     closest = None
     min_dist = float('inf')
-    for node in nodes:
-        nx, ny = node
+    positions = view.vertex_positions
+    for node in _candidates(view.vertex_grid, pos, threshold, len(positions)):
+        nx, ny = positions[node]
         dist = math.hypot(mx - nx, my - ny)
         if dist < min_dist and dist < threshold:
             min_dist = dist
@@ -33,33 +72,41 @@ def find_closest_node(pos, nodes, threshold=20):
     return closest
 
 
-def find_closest_hex(pos, hexes, threshold=50):
+def find_closest_hex(pos, view, threshold=HEX_THRESHOLD):
+    """Zwraca id najbliższego hexa (albo None)"""
     mx, my = pos
     closest_hex = None
     min_dist = float('inf')
-    for hex_data in hexes:
-        hx, hy = hex_data['position']
+    positions = view.hex_positions
+    for hex_id in _candidates(view.hex_grid, pos, threshold, len(positions)):
+        hx, hy = positions[hex_id]
         dist = math.hypot(mx - hx, my - hy)
         if dist < min_dist and dist < threshold:
             min_dist = dist
-            closest_hex = hex_data
+            closest_hex = hex_id
     return closest_hex
 
 
-def find_closest_edge(pos, graph, threshold=15):
+def edge_line_data(segment):
+    """Dane odcinka liczone raz: x1, y1, dx, dy, współczynniki prostej i długość^2"""
+    (x1, y1), (x2, y2) = segment
+    A = y2 - y1
+    B = x1 - x2
+    C = x2 * y1 - x1 * y2
+    return x1, y1, x2 - x1, y2 - y1, A, B, C, math.hypot(A, B), (x2 - x1) ** 2 + (y2 - y1) ** 2
+
+
+def find_closest_edge(pos, view, threshold=EDGE_THRESHOLD):
+    """Zwraca parę wierzchołków (u, v) najbliższej krawędzi (albo None)"""
     mx, my = pos
     closest_edge = None
     min_dist = float('inf')
-    for u, v in graph.edges():
-        x1, y1 = u
-        x2, y2 = v
-        A = y2 - y1
-        B = x1 - x2
-        C = x2 * y1 - x1 * y2
-        dist = abs(A * mx + B * my + C) / math.hypot(A, B)
-        segment_length = math.hypot(x2 - x1, y2 - y1)
-        dot_product = ((mx - x1) * (x2 - x1) + (my - y1) * (y2 - y1)) / (segment_length ** 2)
+    edge_data = view.edge_data
+    for edge in _candidates(view.edge_grid, pos, threshold, len(edge_data)):
+        x1, y1, dx, dy, A, B, C, norm, length_sq = edge_data[edge]
+        dist = abs(A * mx + B * my + C) / norm
+        dot_product = ((mx - x1) * dx + (my - y1) * dy) / length_sq
         if 0 <= dot_product <= 1 and dist < min_dist and dist < threshold:
             min_dist = dist
-            closest_edge = (u, v)
+            closest_edge = view.edges[edge]
     return closest_edge
@@ -1,9 +1,14 @@
+import time
 import pygame
-import math
-from game.constants import WIDTH, HEIGHT, FPS, HEX_SIZE, PLAYERS_NUMBERS
-from game.graphics import render_game
-from game.utils import get_hex_positions, rounded_pos, find_closest_node, find_closest_edge, find_closest_hex
-from game.game_state import GameState
+from game.board_view import BoardView
+from game.constants import (WIDTH, HEIGHT, FPS, HEX_SIZE, PLAYERS_NUMBERS, EVENT_WAIT_TIMEOUT,
+                            PROFILING, PROFILE_DUMP_PATH, PROFILE_DUMP_INTERVAL)
+from game.enums import Resource
+from game.event_log import RingBufferSink
+from game.graphics import BoardRenderer, text_cache
+from game.profiling import profiler
+from game.utils import find_closest_node, find_closest_edge, find_closest_hex
+from game.game_state import create_game
 
 
 def initialize_game():
@@ -13,159 +18,138 @@ def initialize_game():
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 24)
 
-    game = GameState()
-    for _ in range(PLAYERS_NUMBERS):
-        game.add_player()
-
-    from game.constants import RESOURCES, TOKENS
-    resource_list = RESOURCES.copy()
-    token_list = TOKENS.copy()
-
-    import random
-    random.shuffle(resource_list)
-    random.shuffle(token_list)
-
-    hex_positions = get_hex_positions(WIDTH // 2, HEIGHT // 2, HEX_SIZE)
-
-    vertex_positions = {}
-    edge_positions = set()
-
-    from game.enums import BuildingType
-
-    for pos in hex_positions:
-        res = resource_list.pop()
-        token = None if res == 'pustynia' else token_list.pop()
-
-        vertices = []
-        for i in range(6):
-            angle = i * 60 + 30
-            angle_rad = angle * 3.14159 / 180
-            dx = HEX_SIZE * math.cos(angle_rad)
-            dy = HEX_SIZE * math.sin(angle_rad)
-            vertex = rounded_pos((pos[0] + dx, pos[1] + dy))
-            vertices.append(vertex)
-
-        hex_data = {
-            'position': pos,
-            'resource': res,
-            'token': token,
-            'vertices': vertices
-        }
-        game.hexes.append(hex_data)
-
-        for vertex in vertices:
-            if vertex not in game.graph:
-                game.graph.add_node(vertex, pos=vertex, owner=None, building=BuildingType.NONE)
-
-        for i in range(6):
-            u = vertices[i]
-            v = vertices[(i + 1) % 6]
-            if (u, v) not in edge_positions and (v, u) not in edge_positions:
-                game.graph.add_edge(u, v, owner=None)
-                edge_positions.add((u, v))
-
-    return screen, clock, font, game
-
-
-def main():
-    screen, clock, font, game = initialize_game()
+    game = create_game(PLAYERS_NUMBERS)
+    view = BoardView(game.board.topology, WIDTH // 2, HEIGHT // 2, HEX_SIZE)
+
+    return screen, clock, font, game, view
+
+
+def handle_event(event, game, view):
+    """Obsługa jednego zdarzenia z klawiatury/myszy, zwraca False jak trzeba zamknąć grę"""
+    if event.type == pygame.QUIT:
+        return False
+
+    elif event.type == pygame.KEYDOWN:
+        if event.key == pygame.K_SPACE and not game.initial_placement_phase and not game.robber_phase:
+            game.next_turn()
+
+        elif event.key == pygame.K_r and game.initial_placement_phase:
+            game.initial_placement_phase = False
+            game.initial_placement_complete = True
+
+        if event.key == pygame.K_t and not game.initial_placement_phase: # Wchodzimy do trading mode
+            game.trading_mode = True
+            game.trade_stage = 0
+            game.selected_trade_resource = None
+        if game.trading_mode:
+            resource_map = {
+                pygame.K_1: Resource.DREWNO,
+                pygame.K_2: Resource.GLINA,
+                pygame.K_3: Resource.OWCA,
+                pygame.K_4: Resource.ZBOZE,
+                pygame.K_5: Resource.KAMIEN
+            }
+            if event.key in resource_map:
+                if game.trade_stage == 0:
+                    game.selected_trade_resource = resource_map[event.key]
+                    game.trade_stage = 1
+                else:
+                    give_resource = resource_map[event.key]
+                    if give_resource != game.selected_trade_resource:
+                        game.trade_with_bank(
+                            game.current_player_idx,
+                            give_resource,
+                            game.selected_trade_resource
+                        )
+                    game.trading_mode = False
+            if event.key == pygame.K_ESCAPE:
+                game.trading_mode = False
+
+    elif event.type == pygame.MOUSEBUTTONDOWN:
+        if game.initial_placement_phase: # Tutaj jest ta faza początkowa
+            player_id = game.current_player_idx
+            if game.placement_stage == 0:  # Stawianie wioski
+                node = find_closest_node(event.pos, view)
+                if node is not None and game.build_settlement(node, player_id, initial_placement=True):
+                    game.next_initial_placement()
+
+            elif game.placement_stage == 1:  # Stawianie drogi
+                edge = find_closest_edge(event.pos, view)
+                if edge and game.build_road(edge[0], edge[1], player_id):
+                    game.next_initial_placement()
+
+        else:  # Normalny gameplay, wszystkie funkcjonalności
+            if  game.robber_phase and event.button == 1:  # Lewy przycisk myszy jak można postawić
+                hex_id = find_closest_hex(event.pos, view)
+                if hex_id is not None and game.hexes[hex_id]['resource'] != 'pustynia':  # Nie można postawić na pustyni
+                    game.place_robber(hex_id)
+
+            elif event.button == 1:  # Left click — wioska
+                node = find_closest_node(event.pos, view)
+                if node is not None:
+                    game.build_settlement(node, game.current_player_idx)
+
+            elif event.button == 3:  # Right click - droga
+                edge = find_closest_edge(event.pos, view)
+                if edge:
+                    game.build_road(edge[0], edge[1], game.current_player_idx)
+
+            elif event.button == 2:  # Scroll - ulepszenia do miasta
+                node = find_closest_node(event.pos, view)
+                if node is not None:
+                    game.upgrade_to_city(node, game.current_player_idx)
+    return True
+
+
+def main(event_driven=True, profile=PROFILING):
+    if profile:
+        profiler.enable()
+        profiler.start_periodic_dump(PROFILE_DUMP_PATH, PROFILE_DUMP_INTERVAL)
+    screen, clock, font, game, view = initialize_game()
     game.start_initial_placement()  # Startujemy z fazą placementów/rozstawiania
     running = True
 
-    for hex_data in game.hexes:
-        if hex_data['resource'] == 'desert':
-            game.robber_position = hex_data
-            break
-
+    log = RingBufferSink()  # Komunikaty gry (rzuty, kradzieże, brak zasobów) pokazywane na ekranie
+    game.add_listener(log)
+    renderer = BoardRenderer(screen, font, view, log)
+    # Ruch myszy nic nie zmienia, więc nie budzimy się na niego
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
+    rendered_version = None
+    needs_render = True
     while running:
-        render_game(screen, font, game)
-
-        # Pokazaninie jaka jest aktualna faza
-        if game.initial_placement_phase:
-            phase_text = "Faza początkowa - " + (
-                "Załóż osadę" if game.placement_stage == 0 else "Połóż drogę"
-            )
-            phase_label = font.render(phase_text, True, (255, 0, 0))
-            screen.blit(phase_label, (WIDTH // 2 - phase_label.get_width() // 2, 10))
-
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        # Rysujemy tylko jak zmienił się stan gry albo przyszło zdarzenie (plansza jest w cache'u)
+        if needs_render or game.version != rendered_version:
+            frame_start = time.perf_counter()
+            dirty_rects = renderer.render(game)
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            if profiler.enabled:
+                profiler.frame(time.perf_counter() - frame_start)
+            rendered_version = game.version
+            needs_render = False
+
+        if event_driven:
+            # Śpimy aż coś przyjdzie (albo minie timeout), zamiast kręcić pętlę FPS razy na sekundę
+            events = [pygame.event.wait(EVENT_WAIT_TIMEOUT)] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+            clock.tick(FPS)
+
+        for event in events:
+            if event.type == pygame.NOEVENT:
+                continue
+            needs_render = True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()  # Okno zostało zasłonięte, trzeba narysować wszystko
+            if not handle_event(event, game, view):
                 running = False
 
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and not game.initial_placement_phase and not game.robber_phase:
-                    game.next_turn()
-
-                elif event.key == pygame.K_r and game.initial_placement_phase:
-                    game.initial_placement_phase = False
-                    game.initial_placement_complete = True
-
-                if event.key == pygame.K_t and not game.initial_placement_phase: # Wchodzimy do trading mode
-                    game.trading_mode = True
-                    game.trade_stage = 0
-                    game.selected_trade_resource = None
-                if game.trading_mode:
-                    resource_map = {
-                        pygame.K_1: 'drewno',
-                        pygame.K_2: 'glina',
-                        pygame.K_3: 'owca',
-                        pygame.K_4: 'zboze',
-                        pygame.K_5: 'kamień'
-                    }
-                    if event.key in resource_map:
-                        if game.trade_stage == 0:
-                            game.selected_trade_resource = resource_map[event.key]
-                            game.trade_stage = 1
-                        else:
-                            give_resource = resource_map[event.key]
-                            if give_resource != game.selected_trade_resource:
-                                game.trade_with_bank(
-                                    game.current_player_idx,
-                                    give_resource,
-                                    game.selected_trade_resource
-                                )
-                            game.trading_mode = False
-                    if event.key == pygame.K_ESCAPE:
-                        game.trading_mode = False
-
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if game.initial_placement_phase: # Tutaj jest ta faza początkowa
-                    player_id = game.current_player_idx
-                    if game.placement_stage == 0:  # Stawianie wioski
-                        node = find_closest_node(event.pos, game.graph.nodes())
-                        if node and game.build_settlement(node, player_id, initial_placement=True):
-                            game.next_initial_placement()
-
-                    elif game.placement_stage == 1:  # Stawianie drogi
-                        edge = find_closest_edge(event.pos, game.graph)
-                        if edge and game.build_road(edge[0], edge[1], player_id):
-                            game.next_initial_placement()
-
-                else:  # Normalny gameplay, wszystkie funkcjonalności
-                    if  game.robber_phase and event.button == 1:  # Lewy przycisk myszy jak można postawić
-                        hex = find_closest_hex(event.pos, game.hexes)
-                        if hex and hex['resource'] != 'pustynia':  # Nie można postawić na pustyni
-                            game.place_robber(hex['position'])
-
-                    elif event.button == 1:  # Left click — wioska
-                        node = find_closest_node(event.pos, game.graph.nodes())
-                        if node:
-                            game.build_settlement(node, game.current_player_idx)
-
-                    elif event.button == 3:  # Right click - droga
-                        edge = find_closest_edge(event.pos, game.graph)
-                        if edge:
-                            game.build_road(edge[0], edge[1], game.current_player_idx)
-
-                    elif event.button == 2:  # Scroll - ulepszenia do miasta
-                        node = find_closest_node(event.pos, game.graph.nodes())
-                        if node:
-                            game.upgrade_to_city(node, game.current_player_idx)
-
-        clock.tick(FPS)
-
+    if profiler.enabled:
+        profiler.dump(PROFILE_DUMP_PATH)
+        print(profiler.report())
+        print(f"Cache napisów: {text_cache.hits} trafień, {text_cache.misses} pudeł "
+              f"({text_cache.hit_rate:.1%})")
+        profiler.disable()
     pygame.quit()
     return game
 
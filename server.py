@@ -0,0 +1,53 @@
+"""Serwer gry dla wielu stołów naraz (protokół w game/server.py)
+
+Przykłady:
+    python server.py --port 8765 --players 3
+    python server.py --event-log zdarzenia.log
+    python server.py --load-test --tables 1000
+"""
+import argparse
+import asyncio
+
+from game.client import load_test
+from game.constants import PLAYERS_NUMBERS, SERVER_BACKLOG, SERVER_HOST, SERVER_MAX_TURNS, SERVER_PORT
+from game.event_log import BatchedFileSink
+from game.server import GameServer
+
+
+async def serve_forever(host, port, num_players, seed, max_turns, event_sink=None):
+    server = GameServer(num_players, seed=seed, max_turns=max_turns, event_sink=event_sink)
+    listener = await server.serve(host, port, backlog=SERVER_BACKLOG)
+    print(f"Serwer gry na {host}:{port}, {num_players} graczy przy stole")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serwer gry Catan z wieloma stołami")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--players', type=int, default=PLAYERS_NUMBERS, help="graczy przy stole")
+    parser.add_argument('--seed', type=int, help="ziarno pierwszego stołu, kolejne dostają następne")
+    parser.add_argument('--max-turns', type=int, default=SERVER_MAX_TURNS)
+    parser.add_argument('--event-log', help="dopisuj zdarzenia gier ze wszystkich stołów (z nazwą stołu) do pliku tekstowego")
+    parser.add_argument('--load-test', action='store_true', help="serwer i boty w tym procesie, wypisuje wyniki")
+    parser.add_argument('--tables', type=int, default=100, help="ile stołów w teście obciążenia")
+    args = parser.parse_args()
+
+    if args.load_test:
+        results = asyncio.run(load_test(args.tables, args.players, args.seed or 0, args.max_turns, args.host))
+        for name, value in results.items():
+            print(f"{name:22s} {value:.2f}" if isinstance(value, float) else f"{name:22s} {value}")
+        return
+    sink = BatchedFileSink(args.event_log) if args.event_log else None
+    try:
+        asyncio.run(serve_forever(args.host, args.port, args.players, args.seed, args.max_turns, sink))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sink:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Symulacja wielu gier bez pygame, rozłożona na procesy
+
+Przykład: python simulate.py --games 1000 --workers 4 --policies greedy random
+Z --record plik.ctnr wszystkie gry trafiają ruch po ruchu do pliku z game/encoding.py,
+a z --event-log plik.log ich zdarzenia (rzuty, kradzieże, wymiany) do pliku tekstowego.
+"""
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from game.encoding import GameRecordWriter, encode_action, encode_game_start
+from game.enums import ActionType
+from game.event_log import BatchedFileSink
+from game.game_state import create_game
+from game.policies import POLICIES
+from game.profiling import profiler
+
+MAX_TURNS = 500
+
+
+def policy_rng(seed):
+    """Osobny strumień losowania polityk gry seed
+
+    Nie może to być random.Random(seed + 1), bo to jest generator następnej gry (plansza, kostki).
+    """
+    return random.Random(f"{seed}-policy")
+
+
+def play_game(seed, policy_names, max_turns=MAX_TURNS, record=False, fair=False, listeners=()):
+    """Jedna pełna gra: rozstawianie, tury, złodziej i budowanie, ruchy wybierają polityki
+
+    Z record=True wynik ma też 'record': gotowe rekordy gry do dopisania do pliku z grami.
+    fair=True gra na uczciwej planszy (bez sąsiednich 6/8, równe pipsy).
+    listeners są podpinane do gry (GameState.add_listener) przed rozstawianiem.
+    """
+    game = create_game(len(policy_names), rng=seed, fair=fair)
+    for listener in listeners:
+        game.add_listener(listener)
+    rng = policy_rng(seed)
+    policies = [POLICIES[name]() for name in policy_names]
+
+    game.start_initial_placement()
+    records = [encode_game_start(game, seed, fair)] if record else None
+    turns = 0
+    vp_curve = []
+    while game.get_winner() is None and turns < max_turns:
+        actions = game.legal_actions()
+        if not actions:
+            break
+        action = policies[game.current_player_idx].choose_action(game, actions, rng)
+        if records is not None:
+            records.append(encode_action(action, game.current_player_idx))
+        game.apply_action(action)
+        if action[0] == ActionType.END_TURN:
+            turns += 1
+            vp_curve.append([player['victory_points'] for player in game.players])
+
+    result = {
+        'seed': seed,
+        'winner': game.get_winner(),
+        'turns': turns,
+        'victory_points': [player['victory_points'] for player in game.players],
+        'vp_curve': vp_curve
+    }
+    if records is not None:
+        result['record'] = b''.join(records)
+    return result
+
+
+def _play_game_args(args):
+    return play_game(*args)
+
+
+def run_games(num_games, policy_names, workers=None, seed=0, max_turns=MAX_TURNS, record=False, fair=False,
+              listeners=()):
+    """Generator wyników gier po kolei; gra i-ta dostaje ziarno seed + i, więc wynik nie zależy od liczby procesów
+
+    Wyniki wychodzą od razu, jak gra się skończy, więc przy milionach gier nic się nie zbiera w pamięci.
+    listeners dostają zdarzenia wszystkich gier, więc wtedy gry muszą iść w tym procesie (workers=1).
+    """
+    if listeners and workers != 1:
+        raise ValueError("Listenery działają tylko z workers=1")
+    jobs = ((seed + i, policy_names, max_turns, record, fair) for i in range(num_games))
+    if workers == 1:
+        for job in jobs:
+            yield play_game(*job, listeners=listeners)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, num_games // ((workers or os.cpu_count() or 1) * 4))
+        yield from executor.map(_play_game_args, jobs, chunksize=chunksize)
+
+
+def write_records(results, writer):
+    """Dopisuje rekord każdej gry do pliku, jak tylko przyjdzie, i oddaje wynik już bez niego"""
+    for result in results:
+        writer.write(result.pop('record'))
+        yield result
+
+
+def summarize(results, num_players):
+    """Procent wygranych, długości gier i średnie punkty po każdej turze
+
+    results czytamy raz, po kolei (może to być generator z run_games) i trzymamy tylko sumy.
+    """
+    games = unfinished = total_turns = 0
+    min_turns = None
+    wins = [0] * num_players
+    turn_totals = []  # Suma punktów po turze z gier, które jeszcze trwały
+    # Gry które skończyły się wcześniej liczymy dalej z końcowymi punktami: final_from[t] to suma
+    # końcowych punktów gier, które trwały t tur
+    final_from = []
+    for result in results:
+        games += 1
+        if result['winner'] is None:
+            unfinished += 1
+        else:
+            wins[result['winner']] += 1
+        turns = result['turns']
+        total_turns += turns
+        min_turns = turns if min_turns is None else min(min_turns, turns)
+
+        curve = result['vp_curve']
+        for totals in (turn_totals, final_from):
+            while len(totals) <= len(curve):
+                totals.append([0] * num_players)
+        for turn, points in enumerate(curve):
+            for player_id, vp in enumerate(points):
+                turn_totals[turn][player_id] += vp
+        for player_id, vp in enumerate(result['victory_points']):
+            final_from[len(curve)][player_id] += vp
+
+    longest = len(turn_totals) - 1 if turn_totals else 0
+    vp_curve = []
+    finished = [0] * num_players
+    for turn in range(longest):
+        finished = [done + vp for done, vp in zip(finished, final_from[turn])]
+        vp_curve.append([(total + done) / games for total, done in zip(turn_totals[turn], finished)])
+
+    return {
+        'games': games,
+        'win_rates': [count / games for count in wins] if games else [],
+        'unfinished': unfinished,
+        'mean_turns': total_turns / games if games else 0,
+        'min_turns': min_turns or 0,
+        'max_turns': longest,
+        'mean_vp_curve': vp_curve
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symulacja gier Catan bez grafiki")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="domyślnie liczba rdzeni")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-turns', type=int, default=MAX_TURNS)
+    parser.add_argument('--policies', nargs='+', default=['random', 'random'], choices=sorted(POLICIES))
+    parser.add_argument('--output', help="zapisz podsumowanie do pliku JSON")
+    parser.add_argument('--record', help="dopisz wszystkie gry ruch po ruchu do pliku z grami")
+    parser.add_argument('--fair', action='store_true', help="tylko uczciwe plansze (bez sąsiednich 6/8)")
+    parser.add_argument('--profile', help="zmierz czasy metod GameState i zapisz do pliku JSON (gry w jednym procesie)")
+    parser.add_argument('--event-log', help="dopisz zdarzenia gier do pliku tekstowego (gry w jednym procesie)")
+    args = parser.parse_args()
+
+    if args.profile or args.event_log:
+        # Pomiary i zdarzenia są w procesie, który gra, więc wszystko w jednym procesie
+        args.workers = 1
+    if args.profile:
+        profiler.enable()
+    sink = BatchedFileSink(args.event_log) if args.event_log else None
+    writer = GameRecordWriter(args.record) if args.record else None
+    try:
+        # Gry lecą strumieniem: rekord każdej od razu trafia do pliku, a do podsumowania tylko sumy
+        results = run_games(args.games, args.policies, args.workers, args.seed, args.max_turns,
+                            record=writer is not None, fair=args.fair, listeners=[sink] if sink else ())
+        if writer:
+            results = write_records(results, writer)
+        summary = summarize(results, len(args.policies))
+    finally:
+        if sink:
+            sink.close()
+        if writer:
+            writer.close()
+    if args.profile:
+        profiler.dump(args.profile)
+        print(profiler.report())
+        profiler.disable()
+
+    for player_id, (policy, rate) in enumerate(zip(args.policies, summary['win_rates'])):
+        print(f"Gracz {player_id + 1} ({policy}): {rate:.1%} wygranych")
+    print(f"Niedokończone gry: {summary['unfinished']}")
+    print(f"Długość gry: średnio {summary['mean_turns']:.1f} tur "
+          f"(min {summary['min_turns']}, max {summary['max_turns']})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f)
+
+
+if __name__ == "__main__":
+    main()
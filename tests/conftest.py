@@ -0,0 +1,13 @@
+def random_moves(game, rng, steps):
+    """Gra losowymi legalnymi ruchami aż do zwycięzcy lub braku ruchów.
+
+    Po każdym wykonanym ruchu zwraca (gracz, ruch), gracz to ten, który ruszał.
+    """
+    for _ in range(steps):
+        actions = game.legal_actions()
+        if not actions or game.get_winner() is not None:
+            return
+        action = rng.choice(actions)
+        player_id = game.current_player_idx
+        game.apply_action(action)
+        yield player_id, action
@@ -0,0 +1,46 @@
+import numpy as np
+
+from game.analysis import TOKEN_PIPS
+from game.board import TOPOLOGY
+from game.board_generator import MAX_PIP_IMBALANCE, RED_TOKENS, BoardGenerator, hex_neighbors
+from game.constants import RESOURCE_TYPES
+from game.game_state import create_game
+
+
+def pip_imbalance(hexes):
+    """Liczone wprost z hexów gry: średnie pipsy na hex każdego zasobu kontra średnia planszy"""
+    land = [hex_data for hex_data in hexes if hex_data['token']]
+    mean = sum(TOKEN_PIPS[hex_data['token']] for hex_data in land) / len(land)
+    worst = 0.0
+    for resource in RESOURCE_TYPES:
+        pips = [TOKEN_PIPS[hex_data['token']] for hex_data in land if hex_data['resource'] == resource]
+        worst = max(worst, abs(sum(pips) / len(pips) - mean))
+    return worst
+
+
+def test_fair_boards_satisfy_constraints():
+    pairs = hex_neighbors()
+    for seed in range(300):
+        hexes = create_game(rng=seed, fair=True).hexes
+        for a, b in pairs:
+            assert not (hexes[a]['token'] in RED_TOKENS and hexes[b]['token'] in RED_TOKENS), (seed, a, b)
+        assert pip_imbalance(hexes) <= MAX_PIP_IMBALANCE + 1e-9, seed
+        assert sum(hex_data['resource'] == 'pustynia' for hex_data in hexes) == 1
+        assert all((hex_data['token'] is None) == (hex_data['resource'] == 'pustynia') for hex_data in hexes)
+
+
+def test_generator_batches_satisfy_constraints():
+    generator = BoardGenerator()
+    resources, tokens = generator.generate(2000, rng=1)
+    assert resources.shape == tokens.shape == (2000, TOPOLOGY.num_hexes)
+    assert not generator.red_adjacent(tokens).any()
+    assert (generator.pip_imbalance(resources, tokens) <= MAX_PIP_IMBALANCE).all()
+
+
+def test_seeded_generation_is_reproducible():
+    generator = BoardGenerator()
+    first = generator.generate(50, rng=7)
+    second = generator.generate(50, rng=7)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+    for seed in range(20):
+        assert create_game(rng=seed, fair=True).hexes == create_game(rng=seed, fair=True).hexes
@@ -0,0 +1,51 @@
+import json
+import random
+
+from game.diff import apply_diffs, card_counts, full_state, mirror_game, seat_diffs
+from game.encoding import decode_state, encode_state
+from game.enums import DiffType
+from game.game_state import create_game
+
+from conftest import random_moves
+
+
+def check_mirrors(seed):
+    rng = random.Random(seed)
+    game = create_game(3, rng=seed)
+    game.start_initial_placement()
+    game.record_diffs()
+    full = mirror_game(full_state(game))
+    seats = [mirror_game(full_state(game, seat), card_counts(game)) for seat in range(3)]
+    for _ in random_moves(game, rng, 1500):
+        diffs = json.loads(json.dumps(game.take_diffs()))  # Jak po sieci
+        apply_diffs(full, diffs)
+        assert encode_state(full) == encode_state(game)
+        for seat, mirror in enumerate(seats):
+            visible = seat_diffs(diffs, seat)
+            assert all(diff[0] != DiffType.RESOURCES or diff[1] == seat for diff in visible)
+            apply_diffs(mirror, visible)
+            assert mirror.players[seat]['resources'] == game.players[seat]['resources']
+            assert mirror.card_counts == card_counts(game)
+            if game.current_player_idx == seat:
+                assert sorted(mirror.legal_actions(), key=repr) == sorted(game.legal_actions(), key=repr)
+
+
+def test_mirrors_follow_game():
+    for seed in range(5):
+        check_mirrors(seed)
+
+
+def test_apply_diffs_to_plain_decoded_state():
+    rng = random.Random(3)
+    game = create_game(3, rng=3)
+    game.start_initial_placement()
+    game.record_diffs()
+    plain = decode_state(encode_state(game))
+    seat_view = decode_state(encode_state(game))
+    for _ in random_moves(game, rng, 600):
+        diffs = game.take_diffs()
+        apply_diffs(plain, diffs)
+        apply_diffs(seat_view, seat_diffs(diffs, 0))  # Także DiffType.CARDS
+    assert plain.card_counts is None and seat_view.card_counts is None
+    assert encode_state(plain) == encode_state(game)
+    assert seat_view.players[0]['resources'] == game.players[0]['resources']
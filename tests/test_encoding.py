@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from game.encoding import (ACTION_FORMAT, GAME_FORMAT, RECORD_HEADER, GameRecordWriter, decode_state,
+                           encode_state, read_games, replay_game)
+from game.game_state import create_game
+
+from conftest import random_moves
+
+
+def test_state_round_trip():
+    rng = random.Random(14)
+    for num_players in (2, 3, 4):
+        game = create_game(num_players, rng=rng.getrandbits(32))
+        game.start_initial_placement()
+        for _ in range(20):
+            for _ in random_moves(game, rng, 25):
+                pass
+            data = encode_state(game)
+            copy = decode_state(data)
+            assert encode_state(copy) == data
+            assert copy.board.snapshot() == game.board.snapshot()
+            assert sorted(copy.legal_actions(), key=repr) == sorted(game.legal_actions(), key=repr)
+            for player in game.players:
+                assert copy.longest_roads.length(player['id']) == game.longest_roads.length(player['id'])
+
+
+def test_record_file_round_trip(tmp_path):
+    path = tmp_path / 'gry.ctnr'
+    rng = random.Random(15)
+    finals = []
+    with GameRecordWriter(path) as writer:
+        for seed in (1, 2):
+            game = create_game(rng=seed, fair=seed == 2)
+            game.start_initial_placement()
+            writer.start_game(game, seed, fair=seed == 2)
+            for player_id, action in random_moves(game, rng, 300):
+                writer.add_action(action, player_id)
+            finals.append(encode_state(game))
+
+    games = list(read_games(path))
+    assert [(seed, fair) for seed, fair, _, _ in games] == [(1, False), (2, True)]
+    for (seed, fair, state, actions), final in zip(games, finals):
+        game = None
+        for _, game in replay_game(seed, fair, state, actions):
+            pass
+        assert encode_state(game) == final
+
+
+def test_truncated_record_file(tmp_path):
+    path = tmp_path / 'gry.ctnr'
+    game = create_game(rng=7)
+    game.start_initial_placement()
+    with GameRecordWriter(path) as writer:
+        writer.start_game(game, 7)
+        for player_id, action in random_moves(game, random.Random(7), 40):
+            writer.add_action(action, player_id)
+    data = path.read_bytes()
+    [(_, _, state, actions)] = read_games(path)
+    assert len(actions) == 40
+    first_action = RECORD_HEADER.size + ACTION_FORMAT.size + GAME_FORMAT.size + len(state)
+
+    # Ucięcie równo na granicy rekordów to po prostu krótsza gra
+    path.write_bytes(data[:first_action + 10 * ACTION_FORMAT.size])
+    [(seed, _, _, actions)] = read_games(path)
+    assert seed == 7 and len(actions) == 10
+
+    # W środku nagłówka pliku, nagłówka gry, zapisanego stanu i ostatniego ruchu
+    for cut in (3, RECORD_HEADER.size + 2, RECORD_HEADER.size + ACTION_FORMAT.size + 5,
+                first_action - 1, len(data) - 1):
+        path.write_bytes(data[:cut])
+        with pytest.raises(ValueError, match="Ucięty|nie jest plik"):
+            list(read_games(path))
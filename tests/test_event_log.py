@@ -0,0 +1,22 @@
+from game.enums import EventType
+from game.event_log import BatchedFileSink
+
+
+def test_batched_sink_marks_lines_with_source(tmp_path):
+    path = tmp_path / 'zdarzenia.log'
+    with BatchedFileSink(path, batch_size=2) as sink:
+        first, second = sink.listener('stol-1'), sink.listener('stol-2')
+        first(EventType.DICE_ROLLED, {'player': 0, 'roll': 8})
+        second(EventType.DICE_ROLLED, {'player': 1, 'roll': 5})
+        sink(EventType.TURN_ENDED, {'player': 0})
+    assert path.read_text(encoding='utf-8').splitlines() == [
+        "stol-1\tDICE_ROLLED\tGracz 1 wyrzucił: 8",
+        "stol-2\tDICE_ROLLED\tGracz 2 wyrzucił: 5",
+    ]
+
+
+def test_batched_sink_without_type_filter_logs_everything(tmp_path):
+    path = tmp_path / 'zdarzenia.log'
+    with BatchedFileSink(path, types=None) as sink:
+        sink(EventType.TURN_ENDED, {'player': 0})
+    assert path.read_text(encoding='utf-8') == "TURN_ENDED\tGracz 1 kończy turę\n"
@@ -0,0 +1,54 @@
+import random
+
+from game.enums import ActionType
+from game.features import ACTION_SIZE, index_to_action
+from game.game_state import create_game
+
+from conftest import random_moves
+
+
+def random_states(seed, games=3, steps=400):
+    """Stany z kilku losowych gier, po kolei (gra idzie dalej losowymi legalnymi ruchami)"""
+    rng = random.Random(seed)
+    for _ in range(games):
+        game = create_game(rng=rng.getrandbits(32))
+        game.start_initial_placement()
+        yield game
+        for _ in random_moves(game, rng, steps):
+            yield game
+
+
+def test_apply_action_accepts_exactly_legal_actions():
+    for game in random_states(seed=6):
+        legal = set(game.legal_actions())
+        state = game.snapshot()
+        for index in range(ACTION_SIZE):
+            action = index_to_action(index)
+            assert game.apply_action(action) == (action in legal), action
+            game.restore(state)
+
+
+def test_restore_returns_to_snapshot():
+    rng = random.Random(1)
+    for index, game in enumerate(random_states(seed=1)):
+        if index % 25:
+            continue
+        state = game.snapshot()
+        legal = game.legal_actions()
+        for _ in random_moves(game, rng, 30):
+            pass
+        game.restore(state)
+        assert game.snapshot() == state
+        assert game.legal_actions() == legal
+
+
+def test_apply_action_rejects_arguments_outside_board():
+    for game in random_states(seed=5, games=1, steps=200):
+        state = game.snapshot()
+        topology = game.board.topology
+        sizes = {ActionType.SETTLEMENT: topology.num_vertices, ActionType.CITY: topology.num_vertices,
+                 ActionType.ROAD: topology.num_edges, ActionType.ROBBER: len(game.hexes)}
+        for action_type, size in sizes.items():
+            for argument in (-1, -size, size, size + 5, None):
+                assert game.apply_action((action_type, argument)) is False
+                assert game.snapshot() == state
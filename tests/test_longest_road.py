@@ -0,0 +1,31 @@
+from game.board import Board, TOPOLOGY
+from game.longest_road import LongestRoadTracker
+
+CENTER_HEX = 9
+
+
+def build(board, tracker, vertices, player_id=0):
+    """Drogi po kolei między kolejnymi wierzchołkami, zwraca długość po ostatniej"""
+    for u, v in zip(vertices, vertices[1:]):
+        edge = board.edge_id(u, v)
+        board.edge_owner[edge] = player_id
+        length = tracker.add_road(edge, player_id)
+    return length
+
+
+def test_loop_with_tail_counts_trail_not_simple_path():
+    board = Board()
+    tracker = LongestRoadTracker(board)
+    ring = list(TOPOLOGY.hex_vertices[CENTER_HEX])
+    assert build(board, tracker, ring + ring[:1]) == 6
+
+    # Ogon z dwóch dróg od wierzchołka pętli. Najdłuższa ścieżka prosta (bez powtarzania
+    # wierzchołków) ma 2 + 5 = 7, a droga w Catanie może wrócić na wierzchołek: 2 + 6 = 8
+    start = ring[0]
+    middle = next(v for v in TOPOLOGY.vertex_neighbors[start] if v not in ring)
+    end = next(v for v in TOPOLOGY.vertex_neighbors[middle] if v != start)
+    assert build(board, tracker, [start, middle, end]) == 8
+    assert tracker.length(0) == 8
+
+    tracker.rebuild()
+    assert tracker.length(0) == 8
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from game.analysis import TOKEN_PIPS
+from game.enums import ActionType, BuildingType
+from game.game_state import create_game
+from game.robber import evaluate_robber
+
+from conftest import random_moves
+
+BUILDING_AMOUNT = {BuildingType.SETTLEMENT: 1, BuildingType.CITY: 2}
+
+
+def robber_states(seed, count=4):
+    """Kilka stanów z losowej gry, w których trzeba postawić złodzieja"""
+    rng = random.Random(seed)
+    game = create_game(rng=seed)
+    game.start_initial_placement()
+    found = 0
+    for _ in random_moves(game, rng, 3000):
+        if game.robber_phase:
+            yield game
+            found += 1
+            if found == count:
+                return
+
+
+def brute_force(game, thief_id):
+    """Każdy hex po kolei: legalność przez apply_action, produkcja i kradzież wprost z planszy"""
+    board = game.board
+    state = game.snapshot()
+    options = {}
+    for hex_data in game.hexes:
+        hex_id = hex_data['id']
+        legal = game.apply_action((ActionType.ROBBER, hex_id))
+        game.restore(state)
+        if not legal:
+            continue
+        denied = [0] * len(game.players)
+        victims = set()
+        for vertex in hex_data['vertices']:
+            building = board.vertex_building[vertex]
+            if building == BuildingType.NONE:
+                continue
+            owner = board.vertex_owner[vertex]
+            if hex_data['token']:
+                denied[owner] += BUILDING_AMOUNT[building] * TOKEN_PIPS[hex_data['token']]
+            if owner != thief_id:
+                victims.add(owner)
+        steal_chance = 0.0
+        for victim_id in victims:
+            cards = [resource for resource, count in enumerate(game.players[victim_id]['resources'])
+                     for _ in range(count)]
+            steal_chance += bool(cards) / len(victims)
+        options[hex_id] = (denied, steal_chance)
+    return options
+
+
+def best_hex(options, thief_id):
+    """Wybór złodzieja: najwięcej zabranej produkcji rywalom, potem szansa kradzieży, potem niższy hex"""
+    def score(hex_id):
+        denied, steal_chance = options[hex_id]
+        opponents = sum(amount for player_id, amount in enumerate(denied) if player_id != thief_id)
+        return opponents, round(steal_chance, 9), -hex_id
+    return max(options, key=score)
+
+
+def test_evaluate_robber_matches_brute_force():
+    checked = 0
+    for seed in range(6):
+        for game in robber_states(seed):
+            thief_id = game.current_player_idx
+            expected = brute_force(game, thief_id)
+            evaluated = {option['hex']: option for option in evaluate_robber(game, thief_id)}
+            assert sorted(evaluated) == sorted(expected)
+            for hex_id, (denied, steal_chance) in expected.items():
+                option = evaluated[hex_id]
+                assert option['denied'] == denied
+                assert option['steal_chance'] == pytest.approx(steal_chance)
+                assert sum(option['steal'].values()) == pytest.approx(1.0 if option['steal'] else 0.0)
+            choices = {hex_id: (option['denied'], option['steal_chance']) for hex_id, option in evaluated.items()}
+            assert best_hex(choices, thief_id) == best_hex(expected, thief_id)
+            checked += 1
+    assert checked >= 10
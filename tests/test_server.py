@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from game.enums import ActionType, Resource
+from game.features import action_index
+from game.server import GameServer, encode_message
+
+
+async def read_message(reader):
+    return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+
+async def reject_illegal_move():
+    server = GameServer(num_players=2, seed=6)
+    listener = await server.serve('127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    clients = [await asyncio.open_connection('127.0.0.1', port) for _ in range(2)]
+    try:
+        for reader, writer in clients:
+            writer.write(encode_message({'type': 'join', 'table': 'test'}))
+            await writer.drain()
+            assert (await read_message(reader))['type'] == 'joined'
+        # Po zajęciu miejsc każdy dostaje diff, a gracz z ruchem także listę legalnych ruchów
+        diffs = [await read_message(reader) for reader, _ in clients]
+        current = next(seat for seat, message in enumerate(diffs) if 'legal' in message)
+        reader, writer = clients[current]
+        # Wymiana zboża na zboże nigdy nie jest legalna (a kiedyś apply_action ją przyjmował)
+        illegal = action_index((ActionType.TRADE, Resource.ZBOZE, Resource.ZBOZE))
+        assert illegal not in diffs[current]['legal']
+        version = server.tables['test'].game.version
+
+        writer.write(encode_message({'type': 'action', 'action': illegal}))
+        await writer.drain()
+        assert await read_message(reader) == {'type': 'error', 'reason': "ruch niedozwolony"}
+        assert server.tables['test'].game.version == version
+        assert server.stats['rejected'] == 1 and server.stats['actions'] == 0
+    finally:
+        for _, writer in clients:
+            writer.close()
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_server_rejects_move_outside_legal_actions():
+    asyncio.run(reject_illegal_move())
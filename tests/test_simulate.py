@@ -0,0 +1,33 @@
+import random
+
+from game.encoding import GameRecordWriter, read_games
+from game.game_state import create_game
+from simulate import play_game, policy_rng, run_games, summarize, write_records
+
+
+def test_policy_stream_is_not_next_game_stream():
+    for seed in range(20):
+        rng = policy_rng(seed)
+        policy_draws = [rng.random() for _ in range(5)]
+        # Gra seed + 1 losuje wszystko (plansza, kostki, kradzieże) z random.Random(seed + 1)
+        game_rng = random.Random(seed + 1)
+        assert policy_draws != [game_rng.random() for _ in range(5)]
+        next_game = create_game(rng=seed + 1)
+        assert policy_draws != [next_game.rng.random() for _ in range(5)]
+
+
+def test_play_game_is_reproducible():
+    assert play_game(3, ['random', 'greedy']) == play_game(3, ['random', 'greedy'])
+
+
+def test_records_are_written_as_games_finish(tmp_path):
+    path = tmp_path / 'gry.ctnr'
+    with GameRecordWriter(path) as writer:
+        results = write_records(run_games(3, ['random', 'random'], workers=1, seed=7, record=True), writer)
+        first = next(results)
+        writer.file.flush()
+        assert 'record' not in first
+        assert [seed for seed, _, _, _ in read_games(path)] == [7]
+        summary = summarize(results, 2)
+    assert summary['games'] == 2
+    assert [seed for seed, _, _, _ in read_games(path)] == [7, 8, 9]